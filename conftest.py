@@ -0,0 +1,8 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def eager_background_tasks(settings):
+    # Поток из пула не должен писать во временный MEDIA_ROOT теста,
+    # который к тому моменту уже удаляется.
+    settings.BACKGROUND_TASKS_EAGER = True
@@ -0,0 +1,42 @@
+from django.urls import reverse
+
+POST_FIELDS = {
+    'id': lambda post: post.id,
+    'text': lambda post: post.text,
+    'pub_date': lambda post: post.pub_date.isoformat(),
+    'author': lambda post: post.author.username,
+    'group': lambda post: post.group.slug if post.group_id else None,
+    'image': lambda post: post.image.url if post.image else None,
+    'thumbnail': lambda post: post.thumbnail or None,
+    'url': lambda post: reverse('posts:post_detail', args=(post.id,)),
+}
+
+GROUP_FIELDS = {
+    'id': lambda group: group.id,
+    'title': lambda group: group.title,
+    'slug': lambda group: group.slug,
+    'description': lambda group: group.description,
+}
+
+COMMENT_FIELDS = {
+    'id': lambda comment: comment.id,
+    'post': lambda comment: comment.post_id,
+    'author': lambda comment: comment.author.username,
+    'text': lambda comment: comment.text,
+    'created': lambda comment: comment.created.isoformat(),
+}
+
+
+def parse_fields(value, available):
+    """Список полей из ?fields=id,text; ValueError для неизвестных."""
+    if not value:
+        return list(available)
+    fields = [name.strip() for name in value.split(',') if name.strip()]
+    unknown = set(fields) - set(available)
+    if unknown:
+        raise ValueError(', '.join(sorted(unknown)))
+    return fields
+
+
+def serialize(obj, available, fields):
+    return {name: available[name](obj) for name in fields}
@@ -0,0 +1,167 @@
+import json
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+POSTS_COUNT = 3
+
+
+class ApiTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='hasnoname')
+        cls.other = User.objects.create_user(username='other')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.posts = [
+            Post.objects.create(
+                author=cls.user, group=cls.group, text=f'Тестовый пост {i}'
+            )
+            for i in range(POSTS_COUNT)
+        ]
+        cls.post = cls.posts[0]
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def get(self, url, client=None, **params):
+        response = (client or self.guest_client).get(url, params)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        return response.json()
+
+    def send(self, method, url, data, client=None):
+        return getattr(client or self.authorized_client, method)(
+            url, json.dumps(data), content_type='application/json'
+        )
+
+    @override_settings(COUNT_POST=2)
+    def test_post_list_cursor_pagination(self):
+        """Список постов листается курсором до конца."""
+        data = self.get(reverse('api:posts'))
+        self.assertEqual(len(data['results']), 2)
+        self.assertIsNone(data['previous'])
+        rest = self.get(data['next'])
+        self.assertEqual(len(rest['results']), 1)
+        self.assertIsNone(rest['next'])
+        ids = [post['id'] for post in data['results'] + rest['results']]
+        self.assertEqual(ids, [post.id for post in reversed(self.posts)])
+
+    def test_sparse_fields_and_ids(self):
+        """?fields= сужает ответ, ?ids= отдаёт посты в заданном порядке."""
+        ids = [self.posts[0].id, 0, self.posts[2].id]
+        data = self.get(
+            reverse('api:posts'),
+            ids=','.join(map(str, ids)), fields='id,author'
+        )
+        self.assertEqual(data['results'], [
+            {'id': self.posts[0].id, 'author': self.user.username},
+            {'id': self.posts[2].id, 'author': self.user.username},
+        ])
+        response = self.guest_client.get(
+            reverse('api:posts'), {'fields': 'id,password'}
+        )
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+    def test_etag(self):
+        """Повторный запрос с If-None-Match получает 304."""
+        url = reverse('api:post', args=(self.post.id,))
+        etag = self.guest_client.get(url)['ETag']
+        response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+
+    def test_create_and_edit_post(self):
+        """Создание и правка поста проходят валидацию PostForm."""
+        response = self.send(
+            'post', reverse('api:posts'),
+            {'text': 'Новый пост', 'group': self.group.id}
+        )
+        self.assertEqual(response.status_code, HTTPStatus.CREATED)
+        post = Post.objects.get(pk=response.json()['id'])
+        self.assertEqual(post.author, self.user)
+        self.assertEqual(post.group, self.group)
+        response = self.send(
+            'patch', reverse('api:post', args=(post.id,)), {'text': ''}
+        )
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+        self.assertIn('text', response.json()['errors'])
+        response = self.send(
+            'patch', reverse('api:post', args=(post.id,)),
+            {'text': 'Исправлено'}
+        )
+        self.assertEqual(response.json()['text'], 'Исправлено')
+        self.assertEqual(response.json()['group'], self.group.slug)
+
+    def test_patch_requires_json(self):
+        """PATCH с телом формы отклоняется, а не проходит пустой правкой."""
+        response = self.authorized_client.patch(
+            reverse('api:post', args=(self.post.id,)), 'text=Исправлено',
+            content_type='application/x-www-form-urlencoded'
+        )
+        self.assertEqual(
+            response.status_code, HTTPStatus.UNSUPPORTED_MEDIA_TYPE
+        )
+        self.post.refresh_from_db()
+        self.assertNotEqual(self.post.text, 'Исправлено')
+
+    def test_write_permissions(self):
+        """Гость не пишет, чужой пост не редактируется."""
+        response = self.send(
+            'post', reverse('api:posts'), {'text': 'Пост'}, self.guest_client
+        )
+        self.assertEqual(response.status_code, HTTPStatus.UNAUTHORIZED)
+        other_client = Client()
+        other_client.force_login(self.other)
+        response = self.send(
+            'patch', reverse('api:post', args=(self.post.id,)),
+            {'text': 'Чужое'}, other_client
+        )
+        self.assertEqual(response.status_code, HTTPStatus.FORBIDDEN)
+        response = self.guest_client.get(reverse('api:post', args=(0,)))
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    def test_groups(self):
+        """Группы доступны списком и по slug."""
+        data = self.get(reverse('api:groups'))
+        self.assertEqual(data['results'][0]['slug'], self.group.slug)
+        data = self.get(reverse('api:group', args=(self.group.slug,)))
+        self.assertEqual(data['title'], self.group.title)
+
+    def test_comments(self):
+        """Комментарии создаются через CommentForm и листаются курсором."""
+        url = reverse('api:comments', args=(self.post.id,))
+        response = self.send('post', url, {'text': 'Комментарий'})
+        self.assertEqual(response.status_code, HTTPStatus.CREATED)
+        self.assertTrue(Comment.objects.filter(post=self.post).exists())
+        data = self.get(url)
+        self.assertEqual(
+            [comment['text'] for comment in data['results']],
+            ['Комментарий']
+        )
+
+    def test_follow_and_unfollow(self):
+        """Подписка и отписка через API."""
+        url = reverse('api:follow', args=(self.other.username,))
+        response = self.authorized_client.post(url)
+        self.assertEqual(response.json(), {'following': True})
+        data = self.get(reverse('api:follow_list'), self.authorized_client)
+        self.assertEqual(data['following'], [self.other.username])
+        self.authorized_client.delete(url)
+        self.assertFalse(Follow.objects.filter(user=self.user).exists())
+        response = self.authorized_client.post(
+            reverse('api:follow', args=(self.user.username,))
+        )
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
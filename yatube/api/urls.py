@@ -0,0 +1,16 @@
+from django.urls import path
+
+from . import views
+
+app_name = 'api'
+
+urlpatterns = [
+    path('posts/', views.post_list, name='posts'),
+    path('posts/<int:post_id>/', views.post_detail, name='post'),
+    path('posts/<int:post_id>/comments/', views.comment_list,
+         name='comments'),
+    path('groups/', views.group_list, name='groups'),
+    path('groups/<slug:slug>/', views.group_detail, name='group'),
+    path('follow/', views.follow_list, name='follow_list'),
+    path('follow/<str:username>/', views.follow, name='follow'),
+]
@@ -0,0 +1,233 @@
+import json
+from functools import wraps
+
+from django.conf import settings
+from django.http import Http404, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response, set_response_etag
+from django.views.decorators.http import require_http_methods
+
+from posts.forms import CommentForm, PostForm
+from posts.models import Comment, Follow, Group, Post, User
+from posts.paginators import CursorPaginator
+from posts.services import save_post
+from posts.uploadhandlers import rejected_uploads
+
+from .serializers import (COMMENT_FIELDS, GROUP_FIELDS, POST_FIELDS,
+                          parse_fields, serialize)
+
+
+class ApiError(Exception):
+    def __init__(self, message, status=400, **extra):
+        super().__init__(message)
+        self.status = status
+        self.extra = extra
+
+
+def api_view(*methods):
+    """Разрешённые методы и JSON вместо HTML-страниц ошибок."""
+    def decorator(view):
+        @require_http_methods(methods)
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            try:
+                return view(request, *args, **kwargs)
+            except Http404:
+                error = ApiError('Не найдено.', status=404)
+            except ApiError as exc:
+                error = exc
+            return JsonResponse(
+                {'error': str(error), **error.extra}, status=error.status
+            )
+        return wrapper
+    return decorator
+
+
+def json_response(request, data, status=200):
+    """JSON с ETag; на совпавший If-None-Match отвечаем 304."""
+    response = JsonResponse(data, status=status)
+    if request.method != 'GET' or status != 200:
+        return response
+    set_response_etag(response)
+    return get_conditional_response(
+        request, etag=response['ETag'], response=response
+    )
+
+
+def require_user(request):
+    if not request.user.is_authenticated:
+        raise ApiError('Требуется авторизация.', status=401)
+
+
+def request_data(request):
+    """Данные формы из тела: JSON или, только в POST, обычная форма."""
+    if request.content_type == 'application/json':
+        try:
+            data = json.loads(request.body or b'{}')
+        except ValueError:
+            raise ApiError('Некорректный JSON.')
+        if not isinstance(data, dict):
+            raise ApiError('Ожидается JSON-объект.')
+        return data
+    if request.method != 'POST':
+        # Форму Django разбирает только в POST: тело PATCH
+        # молча превратилось бы в пустую правку.
+        raise ApiError('Ожидается application/json.', status=415)
+    return request.POST
+
+
+def get_fields(request, available):
+    try:
+        return parse_fields(request.GET.get('fields'), available)
+    except ValueError as exc:
+        raise ApiError(f'Неизвестные поля: {exc}')
+
+
+def page_url(request, cursor):
+    query = request.GET.copy()
+    query['cursor'] = cursor
+    return f'{request.path}?{query.urlencode()}'
+
+
+def paginated(request, queryset, available, ordering=('-pub_date', '-id')):
+    """Страница по курсору или выборка по ?ids=1,2,3 в заданном порядке."""
+    fields = get_fields(request, available)
+    ids = request.GET.get('ids')
+    if ids is not None:
+        try:
+            ids = [int(pk) for pk in ids.split(',') if pk]
+        except ValueError:
+            raise ApiError('ids должен быть списком чисел.')
+        if len(ids) > settings.API_MAX_IDS:
+            raise ApiError(f'Не больше {settings.API_MAX_IDS} ids за запрос.')
+        found = queryset.in_bulk(ids)
+        results = [found[pk] for pk in ids if pk in found]
+        return {
+            'results': [serialize(obj, available, fields) for obj in results]
+        }
+    paginator = CursorPaginator(queryset, settings.COUNT_POST, ordering)
+    try:
+        page = paginator.page(request.GET.get('cursor'))
+    except ValueError as exc:
+        raise ApiError(str(exc))
+    return {
+        'results': [serialize(obj, available, fields) for obj in page],
+        'next': (
+            page_url(request, page.next_cursor) if page.has_next() else None
+        ),
+        'previous': (
+            page_url(request, page.previous_cursor)
+            if page.has_previous() else None
+        ),
+    }
+
+
+def validation_error(form):
+    return ApiError(
+        'Ошибка валидации.', errors=form.errors.get_json_data()
+    )
+
+
+@api_view('GET', 'POST')
+def post_list(request):
+    if request.method == 'POST':
+        require_user(request)
+        form = PostForm(
+            request_data(request), files=request.FILES or None,
+            too_large=rejected_uploads(request)
+        )
+        if not form.is_valid():
+            raise validation_error(form)
+        post = save_post(form, author=request.user)
+        return json_response(
+            request, serialize(post, POST_FIELDS, POST_FIELDS), status=201
+        )
+    posts = Post.objects.select_related('author', 'group')
+    if request.GET.get('group'):
+        posts = posts.filter(group__slug=request.GET['group'])
+    if request.GET.get('author'):
+        posts = posts.filter(author__username=request.GET['author'])
+    return json_response(request, paginated(request, posts, POST_FIELDS))
+
+
+@api_view('GET', 'POST', 'PATCH')
+def post_detail(request, post_id):
+    post = get_object_or_404(
+        Post.objects.select_related('author', 'group'), pk=post_id
+    )
+    if request.method != 'GET':
+        require_user(request)
+        if post.author != request.user:
+            raise ApiError('Редактировать можно только свои посты.', 403)
+        data = request_data(request)
+        if request.method == 'PATCH':
+            data = {'text': post.text, 'group': post.group_id, **data}
+        form = PostForm(
+            data, files=request.FILES or None, instance=post,
+            too_large=rejected_uploads(request)
+        )
+        if not form.is_valid():
+            raise validation_error(form)
+        post = save_post(form)
+    fields = get_fields(request, POST_FIELDS)
+    return json_response(request, serialize(post, POST_FIELDS, fields))
+
+
+@api_view('GET')
+def group_list(request):
+    return json_response(
+        request,
+        paginated(request, Group.objects.all(), GROUP_FIELDS, ('id',))
+    )
+
+
+@api_view('GET')
+def group_detail(request, slug):
+    group = get_object_or_404(Group, slug=slug)
+    fields = get_fields(request, GROUP_FIELDS)
+    return json_response(request, serialize(group, GROUP_FIELDS, fields))
+
+
+@api_view('GET', 'POST')
+def comment_list(request, post_id):
+    post = get_object_or_404(Post.objects.only('id'), pk=post_id)
+    if request.method == 'POST':
+        require_user(request)
+        form = CommentForm(request_data(request))
+        if not form.is_valid():
+            raise validation_error(form)
+        comment = form.save(commit=False)
+        comment.author = request.user
+        comment.post = post
+        comment.save()
+        return json_response(
+            request,
+            serialize(comment, COMMENT_FIELDS, COMMENT_FIELDS),
+            status=201
+        )
+    comments = Comment.objects.filter(post=post).select_related('author')
+    return json_response(request, paginated(
+        request, comments, COMMENT_FIELDS, ('created', 'id')
+    ))
+
+
+@api_view('GET')
+def follow_list(request):
+    require_user(request)
+    authors = User.objects.filter(following__user=request.user).order_by(
+        'username'
+    ).values_list('username', flat=True)
+    return json_response(request, {'following': list(authors)})
+
+
+@api_view('POST', 'DELETE')
+def follow(request, username):
+    require_user(request)
+    author = get_object_or_404(User, username=username)
+    if request.method == 'DELETE':
+        Follow.objects.filter(user=request.user, author=author).delete()
+        return json_response(request, {'following': False})
+    if author == request.user:
+        raise ApiError('Нельзя подписаться на себя.')
+    Follow.objects.get_or_create(user=request.user, author=author)
+    return json_response(request, {'following': True})
@@ -0,0 +1,179 @@
+import math
+import os
+import random
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+from django.core.cache import cache as default_cache
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.files import locks
+
+from .tasks import run_in_background
+
+POLL_INTERVAL = 0.05
+
+
+class AtomicFileBasedCache(FileBasedCache):
+    """
+    FileBasedCache, у которого add атомарен между процессами.
+
+    В Django add — это has_key и затем set: два процесса могут оба
+    «взять» блокировку single_flight или locked(). Здесь пара
+    выполняется под файловой блокировкой ОС в каталоге кеша, поэтому
+    кеш годится для воркеров одной машины, но не для сетевой ФС.
+    """
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self._createdir()
+        with open(os.path.join(self._dir, 'add.lock'), 'wb') as lock:
+            locks.lock(lock, locks.LOCK_EX)
+            try:
+                return super().add(key, value, timeout, version)
+            finally:
+                locks.unlock(lock)
+
+
+def is_shared(alias=DEFAULT_CACHE_ALIAS):
+    """Видят ли записи кеша все процессы: LocMem и Dummy — нет."""
+    return not isinstance(caches[alias], (LocMemCache, DummyCache))
+
+
+def shared_timeout(timeout, alias=DEFAULT_CACHE_ALIAS):
+    """Срок записи, сбросить которую могут и другие процессы."""
+    if is_shared(alias):
+        return timeout
+    if timeout is None:
+        return settings.LOCAL_CACHE_TIMEOUT
+    return min(timeout, settings.LOCAL_CACHE_TIMEOUT)
+
+
+def lock_key(key):
+    return f'{key}:lock'
+
+
+@contextmanager
+def locked(key, cache=default_cache):
+    """
+    Блокировка ключа между процессами для read-modify-write.
+
+    Отдаёт True, если блокировка взята за CACHE_LOCK_TIMEOUT; столько же
+    она живёт, так что упавший владелец не держит её вечно.
+    """
+    lock = lock_key(key)
+    deadline = time.monotonic() + settings.CACHE_LOCK_TIMEOUT
+    acquired = cache.add(lock, True, settings.CACHE_LOCK_TIMEOUT)
+    while not acquired and time.monotonic() < deadline:
+        time.sleep(POLL_INTERVAL)
+        acquired = cache.add(lock, True, settings.CACHE_LOCK_TIMEOUT)
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            cache.delete(lock)
+
+
+def _wait(cache, key, lock):
+    """Дождаться значения, которое считает владелец блокировки."""
+    deadline = time.monotonic() + settings.CACHE_LOCK_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(POLL_INTERVAL)
+        value = cache.get(key)
+        if value is not None or cache.get(lock) is None:
+            return value
+    return None
+
+
+def single_flight(key, compute, timeout, cache=default_cache):
+    """
+    Значение из кеша; при промахе compute() вызывает один процесс.
+
+    Остальные ждут, пока значение появится. Значение хранится как есть,
+    поэтому с ключом работают incr/decr. None не кешируется.
+    """
+    value = cache.get(key)
+    if value is not None:
+        return value
+    lock = lock_key(key)
+    locked = cache.add(lock, True, settings.CACHE_LOCK_TIMEOUT)
+    if not locked:
+        value = _wait(cache, key, lock)
+        if value is not None:
+            return value
+    try:
+        value = compute()
+        if value is not None:
+            cache.add(key, value, timeout)
+        return value
+    finally:
+        if locked:
+            cache.delete(lock)
+
+
+def _store(cache, key, compute, timeout, stale):
+    started = time.monotonic()
+    value = compute()
+    if value is not None:
+        delta = time.monotonic() - started
+        cache.set(
+            key, (value, time.time() + timeout, delta), timeout + stale
+        )
+    return value
+
+
+def _refresh(cache, key, compute, timeout, stale):
+    try:
+        _store(cache, key, compute, timeout, stale)
+    finally:
+        cache.delete(lock_key(key))
+
+
+def needs_refresh(expires, delta, beta=None):
+    """
+    Вероятностное раннее обновление (XFetch).
+
+    Чем ближе срок и чем дольше считается значение, тем вероятнее,
+    что очередной запрос обновит его заранее — до массового промаха.
+    """
+    if beta is None:
+        beta = settings.CACHE_EARLY_REFRESH_BETA
+    return time.time() - delta * beta * math.log(random.random()) >= expires
+
+
+def fetch(key, compute, timeout, stale=None, background=False,
+          cache=default_cache):
+    """
+    Значение из кеша с защитой от одновременного пересчёта.
+
+    Запись живёт timeout + stale секунд. После timeout (или чуть
+    раньше, см. needs_refresh) пересчёт запускает тот, кто взял
+    блокировку, остальные отдают устаревшее значение. С background=True
+    и пересчитывающий сразу отдаёт старое значение, а compute()
+    выполняется фоновой задачей. None не кешируется.
+    """
+    if stale is None:
+        stale = settings.CACHE_STALE_TIMEOUT
+    entry = cache.get(key)
+    if entry is not None:
+        value, expires, delta = entry
+        if not needs_refresh(expires, delta):
+            return value
+    lock = lock_key(key)
+    if cache.add(lock, True, settings.CACHE_LOCK_TIMEOUT):
+        if entry is not None and background:
+            run_in_background(_refresh, cache, key, compute, timeout, stale)
+            return entry[0]
+        try:
+            return _store(cache, key, compute, timeout, stale)
+        finally:
+            cache.delete(lock)
+    if entry is not None:
+        return entry[0]
+    entry = _wait(cache, key, lock)
+    if entry is not None:
+        return entry[0]
+    return _store(cache, key, compute, timeout, stale)
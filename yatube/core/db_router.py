@@ -0,0 +1,72 @@
+import random
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+_state = threading.local()
+
+# Сессии и учётные записи читаются из основной БД: новая сессия
+# после входа и смена пароля должны быть видны сразу, без лага реплики.
+PRIMARY_APPS = {'sessions', 'auth', 'contenttypes'}
+
+
+def is_pinned():
+    return getattr(_state, 'pinned', False)
+
+
+def start_request(pinned=False):
+    _state.pinned = pinned
+    _state.wrote = False
+
+
+def end_request():
+    """Сбросить состояние потока; вернуть True, если в запросе была запись."""
+    wrote = getattr(_state, 'wrote', False)
+    start_request()
+    return wrote
+
+
+@contextmanager
+def use_primary():
+    """Читать из основной БД внутри блока."""
+    pinned = is_pinned()
+    _state.pinned = True
+    try:
+        yield
+    finally:
+        _state.pinned = pinned
+
+
+class ReplicaRouter:
+    """
+    Чтение — со случайной реплики из DATABASE_REPLICAS, запись — в default.
+
+    После первой записи поток до конца запроса читает из default,
+    чтобы пользователь видел свои изменения; на следующие запросы
+    это продлевает ReplicaStickinessMiddleware. Модели из PRIMARY_APPS
+    всегда читаются из default.
+    """
+
+    def db_for_read(self, model, **hints):
+        if (
+            not settings.DATABASE_REPLICAS or is_pinned()
+            or model._meta.app_label in PRIMARY_APPS
+        ):
+            return DEFAULT_DB_ALIAS
+        return random.choice(settings.DATABASE_REPLICAS)
+
+    def db_for_write(self, model, **hints):
+        _state.pinned = _state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if {obj1._state.db, obj2._state.db} <= databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, **hints):
+        # Реплики получают схему репликацией с основной БД.
+        return db not in settings.DATABASE_REPLICAS
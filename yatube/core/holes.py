@@ -0,0 +1,30 @@
+import base64
+import json
+import re
+
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+PLACEHOLDER = '<!--hole:{}-->'
+PATTERN = re.compile(rb'<!--hole:([A-Za-z0-9_=-]+)-->')
+
+
+def render_hole(template_name, params, request):
+    """Фрагмент видит только params и контекст-процессоры запроса."""
+    return render_to_string(template_name, params, request=request)
+
+
+def placeholder(template_name, params):
+    payload = json.dumps([template_name, params], separators=(',', ':'))
+    token = base64.urlsafe_b64encode(payload.encode()).decode()
+    return mark_safe(PLACEHOLDER.format(token))
+
+
+def fill_holes(content, request):
+    """Подставить в общий для всех закешированный HTML личные фрагменты."""
+    def fill(match):
+        template_name, params = json.loads(base64.urlsafe_b64decode(
+            match.group(1)
+        ))
+        return render_hole(template_name, params, request).encode()
+    return PATTERN.sub(fill, content)
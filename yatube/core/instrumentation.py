@@ -0,0 +1,190 @@
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import caches
+from django.template.base import Template
+from sorl.thumbnail.base import ThumbnailBackend
+
+# Верхние границы корзин гистограмм, мс.
+BUCKETS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+TIMINGS = ('total', 'db', 'template', 'thumbnail')
+VIEWS_KEY = 'instrumentation:views'
+
+_local = threading.local()
+
+
+class RequestStats:
+    def __init__(self):
+        self.queries = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.timings = dict.fromkeys(TIMINGS, 0.0)
+        self.template_depth = 0
+
+    def server_timing(self):
+        return ', '.join((
+            'db;dur={:.1f};desc="{} queries"'.format(
+                self.timings['db'], self.queries
+            ),
+            'tpl;dur={:.1f}'.format(self.timings['template']),
+            'thumb;dur={:.1f}'.format(self.timings['thumbnail']),
+            'cache;desc="hit={} miss={}"'.format(
+                self.cache_hits, self.cache_misses
+            ),
+            'total;dur={:.1f}'.format(self.timings['total']),
+        ))
+
+
+def current():
+    """Статистика текущего запроса или None вне middleware."""
+    return getattr(_local, 'stats', None)
+
+
+@contextmanager
+def collect():
+    _local.stats = RequestStats()
+    try:
+        yield _local.stats
+    finally:
+        _local.stats = None
+
+
+@contextmanager
+def timer(name):
+    stats = current()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        if stats is not None:
+            stats.timings[name] += (time.perf_counter() - started) * 1000
+
+
+def record_cache(hit):
+    stats = current()
+    if stats is None:
+        return
+    if hit:
+        stats.cache_hits += 1
+    else:
+        stats.cache_misses += 1
+
+
+def execute_wrapper(execute, sql, params, many, context):
+    stats = current()
+    if stats is None:
+        return execute(sql, params, many, context)
+    stats.queries += 1
+    with timer('db'):
+        return execute(sql, params, many, context)
+
+
+_template_render = Template.render
+
+
+def instrumented_render(self, context):
+    stats = current()
+    if stats is None or stats.template_depth:
+        return _template_render(self, context)
+    # Считаем только внешний шаблон: include вложены в его время.
+    stats.template_depth += 1
+    try:
+        with timer('template'):
+            return _template_render(self, context)
+    finally:
+        stats.template_depth -= 1
+
+
+def install():
+    Template.render = instrumented_render
+
+
+class InstrumentedThumbnailBackend(ThumbnailBackend):
+    def get_thumbnail(self, file_, geometry_string, **options):
+        with timer('thumbnail'):
+            return super().get_thumbnail(file_, geometry_string, **options)
+
+
+def get_cache():
+    return caches[settings.INSTRUMENTATION_CACHE]
+
+
+def histogram_key(view_name):
+    return f'instrumentation:histogram:{view_name}'
+
+
+def empty_histogram():
+    histogram = {
+        name: {'sum': 0.0, 'buckets': [0] * (len(BUCKETS) + 1)}
+        for name in TIMINGS
+    }
+    histogram.update(
+        count=0, queries={'sum': 0, 'max': 0}, cache_hits=0, cache_misses=0
+    )
+    return histogram
+
+
+def bucket_index(value):
+    for index, bound in enumerate(BUCKETS):
+        if value <= bound:
+            return index
+    return len(BUCKETS)
+
+
+def record_request(view_name, stats):
+    """
+    Добавить запрос в гистограммы представления.
+
+    Гистограммы хранятся в кеше INSTRUMENTATION_CACHE, чтобы их могла
+    прочитать команда dump_timings; обновление не атомарно, поэтому при
+    параллельных запросах значения приблизительные.
+    """
+    cache = get_cache()
+    key = histogram_key(view_name)
+    histogram = cache.get(key) or empty_histogram()
+    histogram['count'] += 1
+    for name in TIMINGS:
+        value = stats.timings[name]
+        histogram[name]['sum'] += value
+        histogram[name]['buckets'][bucket_index(value)] += 1
+    histogram['queries']['sum'] += stats.queries
+    histogram['queries']['max'] = max(
+        histogram['queries']['max'], stats.queries
+    )
+    histogram['cache_hits'] += stats.cache_hits
+    histogram['cache_misses'] += stats.cache_misses
+    cache.set(key, histogram, None)
+    views = cache.get(VIEWS_KEY) or set()
+    if view_name not in views:
+        cache.set(VIEWS_KEY, views | {view_name}, None)
+
+
+def get_histograms():
+    cache = get_cache()
+    views = sorted(cache.get(VIEWS_KEY) or ())
+    histograms = cache.get_many([histogram_key(name) for name in views])
+    return {
+        name: histograms[histogram_key(name)]
+        for name in views if histogram_key(name) in histograms
+    }
+
+
+def reset_histograms():
+    cache = get_cache()
+    views = cache.get(VIEWS_KEY) or ()
+    cache.delete_many([histogram_key(name) for name in views] + [VIEWS_KEY])
+
+
+def percentile(buckets, fraction):
+    """Верхняя граница корзины, в которую попадает заданный перцентиль."""
+    total = sum(buckets)
+    if not total:
+        return None
+    seen = 0
+    for index, count in enumerate(buckets):
+        seen += count
+        if seen >= total * fraction:
+            return BUCKETS[index] if index < len(BUCKETS) else None
+    return None
@@ -0,0 +1,56 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from core import instrumentation
+
+
+class Command(BaseCommand):
+    help = (
+        'Выводит гистограммы времени ответа по именам URL, '
+        'накопленные InstrumentationMiddleware.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--json', action='store_true',
+            help='Вывести гистограммы целиком в формате JSON.'
+        )
+        parser.add_argument(
+            '--reset', action='store_true',
+            help='Очистить гистограммы после вывода.'
+        )
+
+    def handle(self, *args, **options):
+        histograms = instrumentation.get_histograms()
+        if options['json']:
+            self.stdout.write(json.dumps(
+                {'buckets': instrumentation.BUCKETS, 'views': histograms},
+                indent=2
+            ))
+        else:
+            self.write_table(histograms)
+        if options['reset']:
+            instrumentation.reset_histograms()
+
+    def write_table(self, histograms):
+        if not histograms:
+            self.stdout.write('Нет данных: включите INSTRUMENTATION_ENABLED.')
+            return
+        self.stdout.write('{:<28}{:>8}{:>10}{:>10}{:>10}{:>10}{:>10}'.format(
+            'view', 'count', 'p50,ms', 'p95,ms', 'db,ms', 'tpl,ms', 'queries'
+        ))
+        for view_name, histogram in histograms.items():
+            count = histogram['count']
+            buckets = histogram['total']['buckets']
+            self.stdout.write(
+                '{:<28}{:>8}{:>10}{:>10}{:>10.1f}{:>10.1f}{:>10.1f}'.format(
+                    view_name,
+                    count,
+                    instrumentation.percentile(buckets, 0.5) or '>5000',
+                    instrumentation.percentile(buckets, 0.95) or '>5000',
+                    histogram['db']['sum'] / count,
+                    histogram['template']['sum'] / count,
+                    histogram['queries']['sum'] / count,
+                )
+            )
@@ -0,0 +1,67 @@
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from . import db_router, instrumentation
+
+
+class InstrumentationMiddleware:
+    """
+    Счётчики запросов к БД, времени шаблонов, миниатюр и кеша.
+
+    Включается настройкой INSTRUMENTATION_ENABLED; отдаёт заголовок
+    Server-Timing и копит гистограммы по имени URL.
+    """
+
+    def __init__(self, get_response):
+        if not settings.INSTRUMENTATION_ENABLED:
+            raise MiddlewareNotUsed
+        instrumentation.install()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with instrumentation.collect() as stats, ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(
+                    instrumentation.execute_wrapper
+                ))
+            started = time.perf_counter()
+            response = self.get_response(request)
+            stats.timings['total'] = (time.perf_counter() - started) * 1000
+        response['Server-Timing'] = stats.server_timing()
+        match = getattr(request, 'resolver_match', None)
+        if match is not None:
+            instrumentation.record_request(match.view_name, stats)
+        return response
+
+
+class ReplicaStickinessMiddleware:
+    """
+    Закрепляет чтение за основной БД после записи.
+
+    Если запрос что-то записал, ставим куку на REPLICA_STICKY_SECONDS:
+    пока она жива, запросы пользователя не читают из реплик, которые
+    могут отставать.
+    """
+
+    cookie_name = 'use_primary'
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        db_router.start_request(pinned=self.cookie_name in request.COOKIES)
+        try:
+            response = self.get_response(request)
+        finally:
+            wrote = db_router.end_request()
+        if wrote and settings.DATABASE_REPLICAS:
+            response.set_cookie(
+                self.cookie_name, '1',
+                max_age=settings.REPLICA_STICKY_SECONDS,
+                httponly=True
+            )
+        return response
@@ -0,0 +1,50 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections, transaction
+
+from .db_router import end_request, start_request
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.BACKGROUND_TASKS_WORKERS,
+            thread_name_prefix='yatube-tasks'
+        )
+    return _executor
+
+
+def _run(func, args, kwargs):
+    # Поток пула переживает задачу: состояние роутера сбрасывается,
+    # как в начале и в конце запроса. Задача ставится после коммита —
+    # реплика могла его ещё не получить, поэтому читаем из default.
+    start_request(pinned=True)
+    try:
+        func(*args, **kwargs)
+    except Exception:
+        logger.exception('Фоновая задача %r завершилась ошибкой', func)
+    finally:
+        end_request()
+        connections.close_all()
+
+
+def run_in_background(func, *args, **kwargs):
+    """
+    Выполнить func в пуле фоновых потоков после коммита транзакции.
+
+    При BACKGROUND_TASKS_EAGER = True задача выполняется сразу,
+    в текущем потоке — так удобнее в тестах и при отладке.
+    """
+    if settings.BACKGROUND_TASKS_EAGER:
+        func(*args, **kwargs)
+        return
+    transaction.on_commit(
+        lambda: get_executor().submit(_run, func, args, kwargs)
+    )
@@ -0,0 +1,20 @@
+from django import template
+
+from core.holes import placeholder, render_hole
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def hole(context, template_name, **params):
+    """
+    Личный фрагмент страницы: {% hole 'includes/header.html' %}.
+
+    Когда страница рендерится для общего кеша (request.punch_holes),
+    вместо фрагмента выводится метка, которую fill_holes заменит при
+    выдаче. Параметры должны сериализоваться в JSON.
+    """
+    request = context.get('request')
+    if getattr(request, 'punch_holes', False):
+        return placeholder(template_name, params)
+    return render_hole(template_name, params, request)
@@ -0,0 +1,20 @@
+from django.test import SimpleTestCase
+
+from core.bloom import BloomFilter
+
+
+class BloomFilterTests(SimpleTestCase):
+    def test_has_no_false_negatives(self):
+        """Все добавленные элементы находятся."""
+        bloom = BloomFilter(1000)
+        bloom.update(f'user-{i}' for i in range(1000))
+        self.assertTrue(all(f'user-{i}' in bloom for i in range(1000)))
+
+    def test_false_positive_rate(self):
+        """Доля ложных срабатываний близка к заданной."""
+        bloom = BloomFilter(1000, error_rate=0.01)
+        bloom.update(range(1000))
+        false_positives = sum(
+            1 for i in range(1000, 11000) if i in bloom
+        )
+        self.assertLess(false_positives, 300)
@@ -0,0 +1,139 @@
+import shutil
+import tempfile
+import threading
+import time
+from unittest import mock
+
+from django.core.cache import cache, caches
+from django.core.cache.backends.filebased import FileBasedCache
+from django.test import SimpleTestCase, override_settings
+
+from core.cache import (fetch, lock_key, locked, needs_refresh,
+                        single_flight)
+
+KEY = 'test:value'
+
+
+class Counter:
+    def __init__(self, delay=0):
+        self.calls = 0
+        self.delay = delay
+
+    def __call__(self):
+        self.calls += 1
+        time.sleep(self.delay)
+        return self.calls
+
+
+class CacheStampedeTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def run_concurrently(self, func, threads=5):
+        results = []
+        workers = [
+            threading.Thread(target=lambda: results.append(func()))
+            for _ in range(threads)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        return results
+
+    def test_single_flight_computes_once(self):
+        """Одновременные промахи вызывают compute() один раз."""
+        compute = Counter(delay=0.2)
+        results = self.run_concurrently(
+            lambda: single_flight(KEY, compute, 60)
+        )
+        self.assertEqual(compute.calls, 1)
+        self.assertEqual(results, [1] * 5)
+
+    def test_fetch_computes_once(self):
+        """fetch() тоже пересчитывает значение в одном потоке."""
+        compute = Counter(delay=0.2)
+        results = self.run_concurrently(lambda: fetch(KEY, compute, 60))
+        self.assertEqual(compute.calls, 1)
+        self.assertEqual(results, [1] * 5)
+
+    def test_stale_value_is_served_during_refresh(self):
+        """Пока значение пересчитывается, остальные получают старое."""
+        compute = Counter()
+        fetch(KEY, compute, timeout=0, stale=60)
+        cache.add(lock_key(KEY), True)
+        self.assertEqual(fetch(KEY, compute, 60), 1)
+        self.assertEqual(compute.calls, 1)
+        cache.delete(lock_key(KEY))
+        self.assertEqual(fetch(KEY, compute, 60), 2)
+
+    def test_background_refresh(self):
+        """С background=True устаревшее значение отдаётся сразу."""
+        compute = Counter()
+        fetch(KEY, compute, timeout=0, stale=60)
+        with self.settings(BACKGROUND_TASKS_EAGER=True):
+            self.assertEqual(fetch(KEY, compute, 60, background=True), 1)
+        self.assertEqual(fetch(KEY, compute, 60), 2)
+        self.assertIsNone(cache.get(lock_key(KEY)))
+
+    def test_locked_serializes_updates(self):
+        """Под locked() инкременты из разных потоков не теряются."""
+        cache.set(KEY, 0)
+
+        def increment():
+            with locked(KEY):
+                value = cache.get(KEY)
+                time.sleep(0.01)
+                cache.set(KEY, value + 1)
+
+        self.run_concurrently(increment)
+        self.assertEqual(cache.get(KEY), 5)
+        self.assertIsNone(cache.get(lock_key(KEY)))
+
+    @override_settings(CACHE_LOCK_TIMEOUT=0.1)
+    def test_locked_gives_up_after_timeout(self):
+        """Чужую блокировку ждём не дольше CACHE_LOCK_TIMEOUT."""
+        cache.add(lock_key(KEY), True)
+        with locked(KEY) as acquired:
+            self.assertFalse(acquired)
+        self.assertTrue(cache.get(lock_key(KEY)))
+
+    def test_early_refresh_probability(self):
+        """Долгий пересчёт и большой beta обновляют значение заранее."""
+        expires = time.time() + 10
+        self.assertFalse(needs_refresh(expires, delta=1, beta=0))
+        self.assertTrue(needs_refresh(expires, delta=1000, beta=1000))
+
+    def test_file_based_cache(self):
+        """Кеш можно вынести в файлы, общие для всех воркеров."""
+        location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, location, ignore_errors=True)
+        with override_settings(CACHES={'default': {
+            'BACKEND': 'core.cache.AtomicFileBasedCache',
+            'LOCATION': location,
+        }}):
+            compute = Counter()
+            self.assertEqual(fetch(KEY, compute, 60), 1)
+            self.assertEqual(fetch(KEY, compute, 60), 1)
+            self.assertEqual(single_flight('test:count', compute, 60), 2)
+
+    def test_file_based_add_is_atomic(self):
+        """Файловый кеш отдаёт блокировку только одному из потоков."""
+        location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, location, ignore_errors=True)
+        has_key = FileBasedCache.has_key
+
+        def slow_has_key(*args, **kwargs):
+            result = has_key(*args, **kwargs)
+            time.sleep(0.05)
+            return result
+
+        with override_settings(CACHES={'default': {
+            'BACKEND': 'core.cache.AtomicFileBasedCache',
+            'LOCATION': location,
+        }}), mock.patch.object(FileBasedCache, 'has_key', slow_has_key):
+            file_cache = caches['default']
+            results = self.run_concurrently(
+                lambda: file_cache.add(lock_key(KEY), True, 60)
+            )
+        self.assertEqual(results.count(True), 1)
@@ -0,0 +1,107 @@
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.db import connections
+from django.test import Client, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core import db_router, tasks
+from posts.models import Post
+
+User = get_user_model()
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class ReplicaRouterTests(TransactionTestCase):
+    databases = '__all__'
+
+    def setUp(self):
+        cache.clear()
+        self.router = db_router.ReplicaRouter()
+        self.user = User.objects.create_user(username='hasnoname')
+        self.post = Post.objects.create(author=self.user, text='Пост')
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+        db_router.start_request()
+
+    def tearDown(self):
+        db_router.end_request()
+
+    def capture(self, client, url, method='get', data=None):
+        with CaptureQueriesContext(connections['default']) as primary, \
+                CaptureQueriesContext(connections['replica']) as replica:
+            response = getattr(client, method)(url, data)
+        return response, primary.captured_queries, replica.captured_queries
+
+    def assertOnlyPrimaryApps(self, queries):
+        """Из основной БД читаются только сессии и пользователи."""
+        for query in queries:
+            self.assertRegex(query['sql'], r'"(django_session|auth_user)"')
+
+    def test_reads_go_to_replica_until_write(self):
+        """Чтение идёт в реплику, после записи — в основную БД."""
+        self.assertEqual(self.router.db_for_read(Post), 'replica')
+        self.assertEqual(self.router.db_for_write(Post), 'default')
+        self.assertEqual(self.router.db_for_read(Post), 'default')
+        self.assertTrue(db_router.end_request())
+        self.assertEqual(self.router.db_for_read(Post), 'replica')
+
+    def test_use_primary(self):
+        """use_primary() временно закрепляет чтение за основной БД."""
+        with db_router.use_primary():
+            self.assertEqual(self.router.db_for_read(Post), 'default')
+        self.assertEqual(self.router.db_for_read(Post), 'replica')
+
+    def test_sessions_and_users_read_from_primary(self):
+        """Сессии и пользователи всегда читаются из основной БД."""
+        for model in (Session, User):
+            with self.subTest(model=model):
+                self.assertEqual(self.router.db_for_read(model), 'default')
+
+    def test_background_task_resets_thread_state(self):
+        """Фоновая задача читает из default и не оставляет потоку запись."""
+        routed = []
+
+        def task():
+            routed.append(self.router.db_for_read(Post))
+            self.router.db_for_write(Post)
+
+        tasks._run(task, (), {})
+        self.assertEqual(routed, ['default'])
+        self.assertFalse(db_router.is_pinned())
+        self.assertFalse(db_router.end_request())
+
+    def test_feed_views_read_from_replica(self):
+        """Ленты читаются из реплики."""
+        for url in (
+            reverse('posts:index'),
+            reverse('posts:profile', kwargs={'username': self.user}),
+            reverse('posts:post_detail', kwargs={'post_id': self.post.id}),
+        ):
+            with self.subTest(url=url):
+                response, primary, replica = self.capture(Client(), url)
+                self.assertEqual(response.status_code, 200)
+                self.assertOnlyPrimaryApps(primary)
+                self.assertTrue(replica)
+
+    def test_reads_stick_to_primary_after_write(self):
+        """После записи запросы пользователя читают из основной БД."""
+        response, *_ = self.capture(
+            self.authorized_client,
+            reverse('posts:add_comment', kwargs={'post_id': self.post.id}),
+            'post', {'text': 'Комментарий'}
+        )
+        self.assertIn('use_primary', response.cookies)
+        _, primary, replica = self.capture(
+            self.authorized_client, reverse('posts:follow_index')
+        )
+        self.assertTrue(primary)
+        self.assertFalse(replica)
+        self.authorized_client.cookies.pop('use_primary')
+        cache.clear()
+        _, primary, replica = self.capture(
+            self.authorized_client, reverse('posts:follow_index')
+        )
+        self.assertOnlyPrimaryApps(primary)
+        self.assertTrue(replica)
@@ -0,0 +1,64 @@
+from io import StringIO
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core import instrumentation
+from posts.models import Post
+
+User = get_user_model()
+
+
+@override_settings(INSTRUMENTATION_ENABLED=True)
+class InstrumentationMiddlewareTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='hasnoname')
+        cls.post = Post.objects.create(
+            author=cls.user,
+            text='Тестовый текст для поста',
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_server_timing_header(self):
+        """Ответ содержит заголовок Server-Timing с числом запросов."""
+        response = self.guest_client.get(
+            reverse('posts:post_detail', kwargs={'post_id': self.post.id})
+        )
+        self.assertIn('Server-Timing', response)
+        self.assertRegex(response['Server-Timing'], r'db;dur=[\d.]+;desc="\d+')
+        self.assertIn('tpl;dur=', response['Server-Timing'])
+
+    def test_histograms_are_collected_per_url_name(self):
+        """Гистограммы копятся по имени URL и учитывают кеш лент."""
+        url = reverse('posts:index')
+        self.guest_client.get(url)
+        self.guest_client.get(url)
+        histogram = instrumentation.get_histograms()['posts:index']
+        self.assertEqual(histogram['count'], 2)
+        self.assertEqual(histogram['cache_hits'], 1)
+        self.assertEqual(histogram['cache_misses'], 1)
+        self.assertEqual(sum(histogram['total']['buckets']), 2)
+
+    def test_dump_timings_command(self):
+        """Команда dump_timings выводит гистограммы и очищает их."""
+        self.guest_client.get(reverse('posts:index'))
+        out = StringIO()
+        call_command('dump_timings', '--json', '--reset', stdout=out)
+        self.assertIn('posts:index', json.loads(out.getvalue())['views'])
+        self.assertEqual(instrumentation.get_histograms(), {})
+
+
+class InstrumentationDisabledTests(TestCase):
+    def test_middleware_is_not_used_by_default(self):
+        """Без INSTRUMENTATION_ENABLED заголовок не добавляется."""
+        response = Client().get(reverse('about:author'))
+        self.assertNotIn('Server-Timing', response)
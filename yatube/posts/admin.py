@@ -1,6 +1,39 @@
+from django import forms
 from django.contrib import admin
+from django.forms.utils import flatatt
+from django.utils.html import format_html, format_html_join
 
+from .counters import EstimatedCountPaginator
 from .models import Group, Post
+from .objects import group_choices
+from .search import SearchResults
+
+
+class CachedOptionsSelect(forms.Select):
+    """
+    Select, который собирает <option> один раз на выбранное значение.
+
+    Копии виджета в строках list_editable делят общий словарь, так что
+    сотня строк не рендерит сотню одинаковых списков через шаблоны.
+    """
+
+    def __init__(self, attrs=None, choices=()):
+        super().__init__(attrs, choices)
+        self.rendered_options = {}
+
+    def render(self, name, value, attrs=None, renderer=None):
+        value = '' if value is None else str(value)
+        options = self.rendered_options.get(value)
+        if options is None:
+            options = format_html_join(
+                '', '<option value="{}"{}>{}</option>', (
+                    (key, ' selected' if str(key) == value else '', label)
+                    for key, label in self.choices
+                )
+            )
+            self.rendered_options[value] = options
+        attrs = self.build_attrs(self.attrs, {'name': name, **(attrs or {})})
+        return format_html('<select{}>{}</select>', flatatt(attrs), options)
 
 
 @admin.register(Group)
@@ -14,6 +47,33 @@ class GroupAdmin(admin.ModelAdmin):
 class PostAdmin(admin.ModelAdmin):
     list_display = ('pk', 'text', 'pub_date', 'author', 'group',)
     list_editable = ('group',)
+    list_select_related = ('author', 'group')
     search_fields = ('text',)
     list_filter = ('pub_date',)
     empty_value_display = '-пусто-'
+    # Число строк оценивается, полный COUNT(*) не нужен.
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if db_field.name != 'group':
+            return super().formfield_for_foreignkey(
+                db_field, request, **kwargs
+            )
+        kwargs['widget'] = CachedOptionsSelect
+        formfield = super().formfield_for_foreignkey(
+            db_field, request, **kwargs
+        )
+        # Готовый список вместо queryset, который иначе выполняется
+        # заново в каждой строке list_editable. Выбранное значение
+        # по-прежнему проверяется через queryset поля.
+        formfield.choices = group_choices()
+        return formfield
+
+    def get_search_results(self, request, queryset, search_term):
+        results = SearchResults(search_term)
+        if not results.terms:
+            return super().get_search_results(
+                request, queryset, search_term
+            )
+        return results.filter(queryset), False
@@ -0,0 +1,106 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.utils.functional import cached_property
+
+from core.cache import shared_timeout, single_flight
+
+from .models import Post
+
+
+def count_key(author_id=None, group_id=None):
+    if author_id is not None:
+        return f'posts:count:author:{author_id}'
+    if group_id is not None:
+        return f'posts:count:group:{group_id}'
+    return 'posts:count:all'
+
+
+def post_count(author_id=None, group_id=None):
+    """
+    Число постов автора, группы или всего сайта из кеша.
+
+    В LocMem incr видит только процесс, принявший запись, поэтому
+    там счётчик живёт не дольше LOCAL_CACHE_TIMEOUT.
+    """
+    posts = Post.objects.all()
+    if author_id is not None:
+        posts = posts.filter(author_id=author_id)
+    elif group_id is not None:
+        posts = posts.filter(group_id=group_id)
+    return single_flight(
+        count_key(author_id, group_id), posts.count,
+        shared_timeout(settings.POST_COUNT_CACHE_TIMEOUT)
+    )
+
+
+def change_count(delta, author_id=None, group_id=None):
+    # Отсутствующий счётчик не создаём: он будет посчитан при чтении.
+    key = count_key(author_id, group_id)
+    try:
+        if cache.incr(key, delta) < 0:
+            cache.delete(key)
+    except ValueError:
+        pass
+
+
+def post_added(post, delta=1):
+    change_count(delta)
+    change_count(delta, author_id=post.author_id)
+    if post.group_id is not None:
+        change_count(delta, group_id=post.group_id)
+
+
+def post_removed(post):
+    post_added(post, delta=-1)
+
+
+def post_regrouped(old_group_id, new_group_id):
+    if old_group_id is not None:
+        change_count(-1, group_id=old_group_id)
+    if new_group_id is not None:
+        change_count(1, group_id=new_group_id)
+
+
+class CountedPaginator(Paginator):
+    """Paginator, который берёт число объектов извне, а не из COUNT(*)."""
+
+    def __init__(self, object_list, per_page, count=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self._count = count
+
+    @cached_property
+    def count(self):
+        if self._count is None:
+            return super().count
+        return self._count
+
+    def page(self, number):
+        # Приблизительный count не должен обрезать последнюю страницу.
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        top = bottom + self.per_page
+        return self._get_page(self.object_list[bottom:top], number, self)
+
+
+def estimate_count(queryset):
+    """
+    Число постов без полного COUNT(*) по большой таблице.
+
+    Без фильтров — кешированный счётчик сайта; с фильтрами строки
+    считаются не дальше ESTIMATED_COUNT_LIMIT.
+    """
+    if not queryset.query.where:
+        return post_count()
+    return queryset[:settings.ESTIMATED_COUNT_LIMIT].count()
+
+
+class EstimatedCountPaginator(CountedPaginator):
+    """CountedPaginator с оценкой числа строк; сигнатура как у Paginator."""
+
+    def __init__(self, object_list, per_page, orphans=0,
+                 allow_empty_first_page=True):
+        super().__init__(
+            object_list, per_page, count=estimate_count(object_list),
+            orphans=orphans, allow_empty_first_page=allow_empty_first_page
+        )
@@ -0,0 +1,45 @@
+import hashlib
+
+from django.db.models import Count, Max
+
+from .feed_cache import ALL_FEEDS, feed_version_name
+from .models import Post
+from .versions import get_versions
+
+
+def make_etag(request, state, *version_names):
+    """
+    Слабый ETag страницы из состояния в БД и версий в кеше.
+
+    В него входят полный путь и пользователь: шапка, кнопки подписки
+    и номер страницы у всех разные. Для лент хватает версий — по ним
+    же строится ключ кеша страницы (cache_feed), так что проверка
+    обходится без запросов к БД.
+    """
+    if state is None:
+        return None
+    parts = [
+        request.get_full_path(),
+        request.user.pk,
+        *sorted(state.items()),
+        *get_versions(ALL_FEEDS, *version_names),
+    ]
+    digest = hashlib.md5(repr(parts).encode()).hexdigest()
+    return f'W/"{digest}"'
+
+
+def post_detail_etag(request, post_id):
+    state = Post.objects.filter(pk=post_id).values(
+        'author__stats__posts_count'
+    ).annotate(
+        last_comment=Max('comments__created'), comments=Count('comments')
+    ).first()
+    return make_etag(request, state, f'post:{post_id}')
+
+
+def profile_etag(request, username):
+    return make_etag(request, {}, feed_version_name('profile', username))
+
+
+def group_etag(request, slug):
+    return make_etag(request, {}, feed_version_name('group', slug))
@@ -0,0 +1,115 @@
+import hashlib
+from functools import wraps
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+
+from core import instrumentation
+from core.cache import fetch, shared_timeout
+from core.holes import fill_holes
+
+from .versions import get_versions
+
+ALL_FEEDS = 'feed:all'
+
+
+def feed_version_name(feed, value=None):
+    if value is None:
+        return f'feed:{feed}'
+    return f'feed:{feed}:{value}'
+
+
+def stats_key(feed, outcome):
+    return f'feed_cache:{outcome}:{feed}'
+
+
+def record(feed, outcome):
+    instrumentation.record_cache(outcome == 'hits')
+    key = stats_key(feed, outcome)
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        pass
+
+
+def get_stats(*feeds):
+    """Счётчики попаданий и промахов кеша лент: {feed: {hits, misses}}."""
+    keys = {
+        (feed, outcome): stats_key(feed, outcome)
+        for feed in feeds for outcome in ('hits', 'misses')
+    }
+    values = cache.get_many(keys.values())
+    stats = {feed: {'hits': 0, 'misses': 0} for feed in feeds}
+    for (feed, outcome), key in keys.items():
+        stats[feed][outcome] = values.get(key, 0)
+    return stats
+
+
+# Параметры, от которых зависит страница ленты; остальные (utm_* и т.п.)
+# не должны плодить копии в кеше.
+PAGE_PARAMS = ('page', 'cursor')
+
+
+def page_key(request, versions):
+    query = urlencode([
+        (name, request.GET[name])
+        for name in PAGE_PARAMS if name in request.GET
+    ])
+    path = hashlib.md5(f'{request.path}?{query}'.encode()).hexdigest()
+    version = '.'.join(str(value) for value in versions)
+    return f'feed_page:{path}:{version}'
+
+
+def cache_feed(feed, kwarg=None):
+    """
+    Кешировать страницу ленты, общую для всех пользователей.
+
+    Ключ включает путь, ?page=/?cursor= и версии ленты, которые
+    сигналы увеличивают при изменении постов и групп, поэтому
+    в общем кеше записи живут долго, но не устаревают; в LocMem —
+    не дольше LOCAL_CACHE_TIMEOUT. Промах пересчитывает один запрос
+    (core.cache.fetch), остальные ждут его.
+    Личные части страницы вынесены в {% hole %}: в кеш попадают метки,
+    а фрагменты для текущего пользователя подставляются при выдаче.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method != 'GET':
+                return view(request, *args, **kwargs)
+            versions = get_versions(
+                ALL_FEEDS,
+                feed_version_name(feed, kwargs.get(kwarg))
+            )
+            rendered = []
+
+            def render():
+                # Только на время view: страница 404 из Http404
+                # рендерится позже и в кеш не попадает.
+                request.punch_holes = True
+                try:
+                    response = view(request, *args, **kwargs)
+                finally:
+                    request.punch_holes = False
+                rendered.append(response)
+                if response.status_code == 200:
+                    return response.content
+                return None
+
+            content = fetch(
+                page_key(request, versions), render,
+                shared_timeout(settings.FEED_CACHE_TIMEOUT)
+            )
+            if rendered:
+                record(feed, 'misses')
+                response = rendered[0]
+            else:
+                record(feed, 'hits')
+                response = HttpResponse(content)
+            response.content = fill_holes(response.content, request)
+            return response
+        return wrapper
+    return decorator
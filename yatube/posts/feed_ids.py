@@ -0,0 +1,130 @@
+import hashlib
+from array import array
+
+from django.conf import settings
+from django.utils.functional import cached_property
+
+from core.cache import single_flight
+
+from .models import Follow
+from .versions import bump, get_versions
+
+
+def ids_version_name(feed, value=None):
+    """Версия состава ленты: 'ids:all', 'ids:author:1', 'ids:group:2'."""
+    if value is None:
+        return f'ids:{feed}'
+    return f'ids:{feed}:{value}'
+
+
+def compact(ids):
+    """Список id как массив: 4 байта на пост вместо объекта модели."""
+    ids = list(ids)
+    typecode = 'I' if max(ids, default=0) < 2 ** 32 else 'Q'
+    return array(typecode, ids)
+
+
+def post_changed(post):
+    """Сбросить списки id лент, в которые пост входит или входил."""
+    group_ids = {post.group_id, post._initial_group_id} - {None}
+    bump(
+        ids_version_name('all'),
+        ids_version_name('author', post.author_id),
+        *(ids_version_name('group', group_id) for group_id in group_ids)
+    )
+
+
+def follow_changed(user_id):
+    bump(ids_version_name('following', user_id))
+
+
+def followed_authors(user_id):
+    version, = get_versions(ids_version_name('following', user_id))
+    return single_flight(
+        f'feed_ids:following:{user_id}:{version}',
+        lambda: compact(
+            Follow.objects.filter(user_id=user_id).values_list(
+                'author_id', flat=True
+            )
+        ),
+        settings.FEED_IDS_TIMEOUT
+    )
+
+
+class FeedIds:
+    """
+    Лента как упорядоченный список id в кеше.
+
+    В кеше лежат только первые FEED_IDS_LENGTH id под версиями состава
+    ленты, поэтому правка текста поста, имени автора или названия группы
+    список не сбрасывает. Страница достаётся одним in_bulk; страницы
+    глубже сохранённого списка читаются из queryset как раньше.
+    """
+
+    def __init__(self, queryset, name, version_names, count=None):
+        self.queryset = queryset
+        versions = get_versions(*version_names)
+        digest = hashlib.md5(repr(versions).encode()).hexdigest()
+        self.key = f'feed_ids:{name}:{digest}'
+        self._count = count
+
+    @classmethod
+    def index(cls, queryset, count=None):
+        return cls(queryset, 'index', [ids_version_name('all')], count)
+
+    @classmethod
+    def author(cls, queryset, author_id, count=None):
+        return cls(
+            queryset, f'author:{author_id}',
+            [ids_version_name('author', author_id)], count
+        )
+
+    @classmethod
+    def group(cls, queryset, group_id, count=None):
+        return cls(
+            queryset, f'group:{group_id}',
+            [ids_version_name('group', group_id)], count
+        )
+
+    @classmethod
+    def follow(cls, queryset, user_id, count=None):
+        names = [ids_version_name('following', user_id)] + [
+            ids_version_name('author', author_id)
+            for author_id in followed_authors(user_id)
+        ]
+        return cls(queryset, f'follow:{user_id}', names, count)
+
+    @cached_property
+    def ids(self):
+        return single_flight(
+            self.key, self.build, settings.FEED_IDS_TIMEOUT
+        )
+
+    def build(self):
+        return compact(self.queryset.values_list('id', flat=True)[
+            :settings.FEED_IDS_LENGTH
+        ])
+
+    @property
+    def complete(self):
+        return len(self.ids) < settings.FEED_IDS_LENGTH
+
+    def count(self):
+        if self.complete:
+            return len(self.ids)
+        count = self._count() if callable(self._count) else self._count
+        return self.queryset.count() if count is None else count
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        if not self.complete and (
+            index.stop is None or index.stop > len(self.ids)
+        ):
+            return list(self.queryset[index])
+        ids = self.ids[index]
+        posts = self.queryset.in_bulk(list(ids))
+        return [posts[post_id] for post_id in ids if post_id in posts]
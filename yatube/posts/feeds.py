@@ -0,0 +1,89 @@
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+
+from core.cache import locked, single_flight
+
+from .models import Follow, Post, UserStats
+
+
+def feed_key(user_id):
+    return f'posts:follow_feed:{user_id}'
+
+
+def followers_count(author_id):
+    return UserStats.objects.filter(user_id=author_id).values_list(
+        'followers_count', flat=True
+    ).first() or 0
+
+
+def fan_out_post(post_id, author_id):
+    """
+    Добавить пост в начало материализованных лент подписчиков автора.
+
+    Авторам с числом подписчиков больше FOLLOW_FEED_FANOUT_LIMIT
+    посты не рассылаются: их записи подмешиваются при чтении ленты.
+    """
+    limit = settings.FOLLOW_FEED_FANOUT_LIMIT
+    if followers_count(author_id) > limit:
+        return
+    followers = Follow.objects.filter(author_id=author_id).values_list(
+        'user_id', flat=True
+    )[:limit]
+    # Отсутствующие ленты не создаём: они соберутся при первом чтении.
+    for key in cache.get_many([feed_key(user_id) for user_id in followers]):
+        # Параллельная рассылка другого поста иначе затрёт этот.
+        with locked(key) as acquired:
+            post_ids = cache.get(key)
+            if not acquired:
+                cache.delete(key)
+            elif post_ids is not None and post_id not in post_ids:
+                cache.set(
+                    key,
+                    [post_id] + post_ids[:settings.FOLLOW_FEED_LENGTH - 1],
+                    settings.FOLLOW_FEED_TIMEOUT
+                )
+
+
+def drop_follower_feeds(author_id):
+    """
+    Сбросить ленты подписчиков автора, вернувшегося под порог рассылки.
+
+    Пока подписчиков было больше порога, его посты в ленты не попадали.
+    """
+    if followers_count(author_id) != settings.FOLLOW_FEED_FANOUT_LIMIT:
+        return
+    cache.delete_many([
+        feed_key(user_id) for user_id in Follow.objects.filter(
+            author_id=author_id
+        ).values_list('user_id', flat=True)
+    ])
+
+
+def drop_feed(user_id):
+    cache.delete(feed_key(user_id))
+
+
+def build_feed(user_id):
+    return list(
+        Post.objects.filter(author__following__user_id=user_id).values_list(
+            'id', flat=True
+        )[:settings.FOLLOW_FEED_LENGTH]
+    )
+
+
+def follow_feed(user):
+    """Посты ленты подписок из материализованного списка id."""
+    post_ids = single_flight(
+        feed_key(user.id), partial(build_feed, user.id),
+        settings.FOLLOW_FEED_TIMEOUT
+    )
+    celebrities = Follow.objects.filter(
+        user=user,
+        author__stats__followers_count__gt=settings.FOLLOW_FEED_FANOUT_LIMIT
+    ).values('author_id')
+    return Post.objects.filter(
+        Q(id__in=post_ids) | Q(author_id__in=celebrities)
+    )
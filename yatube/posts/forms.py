@@ -1,9 +1,38 @@
 from django import forms
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
 
-from .models import Comment, Post
+from .images import normalize_original
+from .models import Comment, Group, Post
 
 
 class PostForm(forms.ModelForm):
+    def __init__(self, *args, too_large=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        # Поля, файлы которых BoundedUploadHandler отбросил по размеру.
+        self.too_large = too_large
+
+    def clean_image(self):
+        if 'image' in self.too_large:
+            # До любой работы с PIL: от файла не осталось ничего.
+            raise forms.ValidationError(
+                'Файл больше %(limit)s МБ.',
+                params={
+                    'limit': settings.POST_IMAGE_MAX_UPLOAD_SIZE // 2 ** 20
+                }
+            )
+        image = self.cleaned_data.get('image')
+        if not isinstance(image, UploadedFile):
+            return image
+        # Размеры берутся из заголовка, пиксели ещё не декодированы.
+        width, height = image.image.size
+        if width * height > settings.POST_IMAGE_MAX_PIXELS:
+            raise forms.ValidationError(
+                'Слишком большое разрешение картинки: %(width)sx%(height)s.',
+                params={'width': width, 'height': height}
+            )
+        return normalize_original(image)
+
     class Meta:
         model = Post
         fields = ('group', 'text', 'image')
@@ -29,3 +58,14 @@ class CommentForm(forms.ModelForm):
         help_texts = {
             'text': 'Текст нового комментария',
         }
+
+
+class SearchForm(forms.Form):
+    q = forms.CharField(label='Поиск', max_length=200)
+    group = forms.ModelChoiceField(
+        queryset=Group.objects.all(),
+        to_field_name='slug',
+        required=False,
+        label='Группа'
+    )
+    author = forms.CharField(label='Автор', max_length=150, required=False)
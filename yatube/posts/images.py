@@ -0,0 +1,181 @@
+import os
+import time
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from PIL import Image, ImageOps, features
+
+from core.instrumentation import timer
+
+from .models import Post
+from .storage import save_exact, touch
+
+FORMATS = {
+    'jpeg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+}
+
+
+def available_formats():
+    # WebP есть не во всех сборках Pillow.
+    return [
+        name for name in settings.POST_IMAGE_FORMATS
+        if name != 'webp' or features.check('webp')
+    ]
+
+
+def normalize_original(upload):
+    """
+    Уменьшить слишком большой оригинал и удалить из него EXIF.
+
+    Файл без EXIF и не больше POST_IMAGE_MAX_SIDE возвращается как есть,
+    без перекодирования.
+    """
+    upload.seek(0)
+    image = Image.open(upload)
+    image_format = image.format
+    max_side = settings.POST_IMAGE_MAX_SIDE
+    too_large = max(image.size) > max_side
+    if getattr(image, 'is_animated', False) or not (
+        too_large or image.getexif()
+    ):
+        upload.seek(0)
+        return upload
+    image = ImageOps.exif_transpose(image)
+    image.thumbnail((max_side, max_side), Image.LANCZOS)
+    if image_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+    buffer = BytesIO()
+    image.save(buffer, image_format, quality=90)
+    return SimpleUploadedFile(
+        upload.name, buffer.getvalue(), content_type=upload.content_type
+    )
+
+
+def rendition_name(image_name, width, extension):
+    stem = os.path.splitext(os.path.basename(image_name))[0]
+    return f'posts/renditions/{stem}_{width}.{extension}'
+
+
+def build_renditions(image_field):
+    """
+    Нарезать картинку поста под ширины POST_IMAGE_SIZES во всех форматах.
+
+    Возвращает список словарей {'format', 'width', 'url'}. Уже
+    существующие файлы не пересоздаются, а только обновляют mtime:
+    у одинаковых картинок одинаковые имена нарезок.
+    """
+    with image_field.open('rb'), timer('thumbnail'):
+        source = ImageOps.exif_transpose(Image.open(image_field))
+        source.load()
+    renditions = []
+    for width, height in settings.POST_IMAGE_SIZES:
+        image = None
+        for name in available_formats():
+            extension = 'jpg' if name == 'jpeg' else name
+            path = rendition_name(image_field.name, width, extension)
+            if not touch(default_storage, path):
+                if image is None:
+                    image = ImageOps.fit(
+                        source.convert('RGB'), (width, height),
+                        Image.LANCZOS
+                    )
+                pil_format, options = FORMATS[name]
+                buffer = BytesIO()
+                image.save(buffer, pil_format, **options)
+                save_exact(default_storage, path, ContentFile(
+                    buffer.getvalue()
+                ))
+            renditions.append({
+                'format': name,
+                'width': width,
+                'url': default_storage.url(path),
+            })
+    return renditions
+
+
+def rendition_names(image_name):
+    for width, _ in settings.POST_IMAGE_SIZES:
+        for name in FORMATS:
+            extension = 'jpg' if name == 'jpeg' else name
+            yield rendition_name(image_name, width, extension)
+
+
+def restore(quarantine, path):
+    try:
+        os.link(quarantine, path)
+    except FileExistsError:
+        pass
+    os.unlink(quarantine)
+
+
+def discard(path, cutoff, in_use):
+    """
+    Удалить брошенный файл, не мешая его повторному использованию.
+
+    Файл сначала переименовывается: touch и save_exact после этого
+    запишут его заново. Если до переименования его успели тронуть
+    (mtime не старше cutoff) или на него появилась ссылка, файл
+    возвращается на место.
+    """
+    quarantine = f'{path}.sweep'
+    try:
+        os.rename(path, quarantine)
+    except FileNotFoundError:
+        return False
+    if os.stat(quarantine).st_mtime >= cutoff or in_use():
+        restore(quarantine, path)
+        return False
+    os.unlink(quarantine)
+    return True
+
+
+def sweep_file(storage, path, cutoff):
+    """Убрать файл из каталога картинок, если он брошен; True — картинка."""
+    if path.endswith('.sweep'):
+        # Прерванный прошлый проход.
+        restore(path, path[:-len('.sweep')])
+        return False
+    try:
+        stale = os.stat(path).st_mtime < cutoff
+    except FileNotFoundError:
+        return False
+    if path.endswith('.tmp'):
+        # Недописанный файл упавшего save_exact.
+        if stale:
+            os.unlink(path)
+        return False
+    name = os.path.relpath(path, storage.location).replace(os.sep, '/')
+    if not stale or not storage.is_blob(name):
+        return False
+    in_use = Post.objects.filter(image=name).exists
+    if not discard(path, cutoff, in_use):
+        return False
+    for rendition in rendition_names(name):
+        discard(default_storage.path(rendition), cutoff, in_use)
+    return True
+
+
+def sweep_images(grace=None):
+    """
+    Удалить картинки постов без ссылок вместе с их нарезками.
+
+    Файлы, к которым обращались меньше grace секунд назад (по умолчанию
+    POST_IMAGE_SWEEP_GRACE), остаются: их могла переиспользовать
+    загрузка, пост которой ещё не сохранён. Возвращает число
+    удалённых картинок.
+    """
+    if grace is None:
+        grace = settings.POST_IMAGE_SWEEP_GRACE
+    cutoff = time.time() - grace
+    field = Post._meta.get_field('image')
+    return sum(
+        sweep_file(field.storage, os.path.join(directory, filename), cutoff)
+        for directory, _, filenames in os.walk(
+            field.storage.path(field.upload_to)
+        )
+        for filename in filenames
+    )
@@ -0,0 +1,143 @@
+import threading
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.http import Http404
+
+from core.bloom import BloomFilter
+from core.cache import is_shared
+from core.tasks import run_in_background
+
+from .models import Group, Post, User
+
+# Вид объекта -> (модель, поле, по которому его ищут в URL).
+KINDS = {
+    'user': (User, 'username'),
+    'group': (Group, 'slug'),
+    'post': (Post, 'pk'),
+}
+
+# (имя БД, вид) -> (начало построения, фильтр); свой в каждом процессе.
+_filters = {}
+# Фильтры, которые сейчас строятся в фоне.
+_building = set()
+_lock = threading.Lock()
+
+
+def missing_key(kind, value):
+    return f'lookup:missing:{kind}:{value}'
+
+
+def exists_key(kind, value):
+    return f'lookup:exists:{kind}:{value}'
+
+
+def reset():
+    """Забыть фильтры процесса, например после bulk_create."""
+    _filters.clear()
+    with _lock:
+        _building.clear()
+
+
+def filter_name(kind):
+    return connection.settings_dict['NAME'], kind
+
+
+def build_filter(kind, name):
+    try:
+        # Время начала: ключи, созданные во время построения, покрыты
+        # метками exists, которые живут от этого момента.
+        started = time.monotonic()
+        model, field = KINDS[kind]
+        values = model.objects.values_list(field, flat=True)
+        bloom = BloomFilter(
+            values.count() * 2, settings.EXISTENCE_FILTER_ERROR_RATE
+        )
+        bloom.update(values.iterator())
+        _filters[name] = (started, bloom)
+    finally:
+        with _lock:
+            _building.discard(name)
+
+
+def get_filter(kind):
+    """
+    Фильтр существующих ключей или None, если доверять нечему.
+
+    Устаревший фильтр перестраивается в фоне, по одной задаче на процесс;
+    до его готовности используется прежний. Фильтр старше двух таймаутов
+    не используется: метки exists живут ровно столько.
+    """
+    name = filter_name(kind)
+    built, bloom = _filters.get(name, (None, None))
+    timeout = settings.EXISTENCE_FILTER_TIMEOUT
+    if built is None or time.monotonic() - built >= timeout:
+        with _lock:
+            schedule = name not in _building
+            _building.add(name)
+        if schedule:
+            run_in_background(build_filter, kind, name)
+            built, bloom = _filters.get(name, (None, None))
+    if built is None or time.monotonic() - built >= timeout * 2:
+        return None
+    return bloom
+
+
+def may_exist(kind, value):
+    """
+    False, если объекта точно нет и в БД можно не ходить.
+
+    Ключи, созданные после построения фильтра (в том числе другими
+    процессами), отмечены в кеше меткой exists на время жизни фильтра.
+    Ложные срабатывания фильтра и удалённые объекты после первого
+    промаха закрываются короткой меткой missing.
+    """
+    value = str(value)
+    bloom = get_filter(kind)
+    if bloom is None or value in bloom:
+        return cache.get(missing_key(kind, value)) is None
+    return cache.get(exists_key(kind, value)) is not None
+
+
+def remember(kind, value):
+    """Отметить новый ключ: вызывается сигналом при сохранении объекта."""
+    value = str(value)
+    if filter_name(kind) in _filters:
+        _filters[filter_name(kind)][1].add(value)
+    cache.set(
+        exists_key(kind, value), True, settings.EXISTENCE_FILTER_TIMEOUT * 2
+    )
+    cache.delete(missing_key(kind, value))
+
+
+def forget_missing(kind, value):
+    cache.set(
+        missing_key(kind, value), True, settings.NEGATIVE_CACHE_TIMEOUT
+    )
+
+
+def require_existing(kind, kwarg):
+    """
+    404 без запросов к БД для заведомо отсутствующих объектов.
+
+    Работает только с общим для процессов кешем: с LocMem новый объект,
+    созданный другим процессом, был бы здесь «несуществующим».
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if not is_shared():
+                return view(request, *args, **kwargs)
+            value = kwargs[kwarg]
+            if not may_exist(kind, value):
+                raise Http404
+            try:
+                return view(request, *args, **kwargs)
+            except Http404:
+                forget_missing(kind, value)
+                raise
+        return wrapper
+    return decorator
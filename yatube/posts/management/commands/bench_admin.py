@@ -0,0 +1,60 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client
+from django.urls import reverse
+
+from posts.models import Post
+from posts.search import rebuild_index, tokenize
+
+from .bench_feeds import Command as BenchFeedsCommand
+
+User = get_user_model()
+
+ADMIN_USERNAME = 'bench-admin'
+
+
+class Command(BenchFeedsCommand):
+    help = (
+        'Генерирует синтетические данные во временной БД и замеряет '
+        'время ответа и число запросов списка постов в админке. '
+        'Результат — JSON.'
+    )
+
+    def generate(self, options):
+        dataset = super().generate(options)
+        # Массовая вставка обходит сигналы индексации. Переполненный
+        # журнал запросов сломал бы их подсчёт в замерах.
+        rebuild_index()
+        connection.queries_log.clear()
+        admin = User.objects.filter(username=ADMIN_USERNAME).first()
+        if admin is None:
+            admin = User.objects.create_superuser(
+                ADMIN_USERNAME, 'bench-admin@example.com', None
+            )
+        dataset['admin'] = admin
+        text = Post.objects.values_list('text', flat=True).first() or ''
+        dataset['term'] = (tokenize(text) or ['post'])[0]
+        return dataset
+
+    def run(self, dataset, options):
+        client = Client()
+        client.force_login(dataset['admin'])
+        url = reverse('admin:posts_post_changelist')
+        pages = [int(page) for page in options['pages'].split(',')]
+        results = [
+            self.measure(
+                client, 'post_changelist', url, page, {'p': page - 1},
+                options
+            )
+            for page in pages
+        ]
+        results.append(self.measure(
+            client, 'post_changelist', url, 1, {'q': dataset['term']},
+            options, mode='search'
+        ))
+        results.append(self.measure(
+            client, 'post_changelist', url, 1,
+            {'pub_date__gte': '2000-01-01 00:00:00+00:00'}, options,
+            mode='filter'
+        ))
+        return results
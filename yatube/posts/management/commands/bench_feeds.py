@@ -0,0 +1,215 @@
+import json
+import random
+import time
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from mixer.backend.django import mixer
+
+from posts import lookups, stats
+from posts.models import Comment, Follow, Group, Post
+from posts.paginators import CursorPaginator
+
+User = get_user_model()
+
+BATCH_SIZE = 1000
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    index = max(0, round(fraction * len(ordered) + 0.5) - 1)
+    return ordered[min(index, len(ordered) - 1)]
+
+
+class Command(BaseCommand):
+    help = (
+        'Генерирует синтетические данные во временной БД и замеряет '
+        'время ответа и число запросов лент. Результат — JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--groups', type=int, default=20)
+        parser.add_argument('--posts', type=int, default=20000)
+        parser.add_argument('--comments', type=int, default=20000)
+        parser.add_argument('--follows', type=int, default=2000)
+        parser.add_argument(
+            '--pages', default='1,10,100',
+            help='Глубины страниц через запятую.'
+        )
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument(
+            '--warm', action='store_true',
+            help='Не очищать кеш перед каждым запросом.'
+        )
+        parser.add_argument(
+            '--use-current-db', action='store_true',
+            help='Работать в текущей БД вместо временной тестовой.'
+        )
+        parser.add_argument('--output', help='Файл для JSON-отчёта.')
+
+    def handle(self, *args, **options):
+        random.seed(options['seed'])
+        mixer.faker.seed_instance(options['seed'])
+        old_name = None
+        try:
+            if not options['use_current_db']:
+                old_name = connection.creation.create_test_db(
+                    verbosity=0, autoclobber=True
+                )
+            dataset = self.generate(options)
+            report = {
+                'django': django.get_version(),
+                'options': {
+                    key: options[key] for key in (
+                        'users', 'groups', 'posts', 'comments', 'follows',
+                        'repeat', 'seed', 'warm'
+                    )
+                },
+                'results': self.run(dataset, options),
+            }
+        finally:
+            if old_name is not None:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+        output = json.dumps(report, indent=2, ensure_ascii=False)
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                file.write(output)
+        self.stdout.write(output)
+
+    def generate(self, options):
+        users = mixer.cycle(options['users']).blend(User)
+        groups = mixer.cycle(options['groups']).blend(Group)
+        self.bulk_create(Post, options['posts'], lambda: Post(
+            author=random.choice(users),
+            group=random.choice(groups + [None]),
+            text=mixer.faker.text(),
+        ))
+        post_ids = list(Post.objects.values_list('id', flat=True))
+        self.bulk_create(Comment, options['comments'], lambda: Comment(
+            post_id=random.choice(post_ids),
+            author=random.choice(users),
+            text=mixer.faker.sentence(),
+        ))
+        pairs = {
+            tuple(random.sample(users, 2)) for _ in range(options['follows'])
+        }
+        # Размер пачки подбирает бэкенд: у SQLite свой предел на запрос.
+        Follow.objects.bulk_create(
+            Follow(user=user, author=author) for user, author in pairs
+        )
+        # Массовая вставка обходит сигналы — пересчитываем UserStats
+        # и сбрасываем счётчики в кеше, версии и фильтры существующих ключей.
+        stats.recount()
+        cache.clear()
+        lookups.reset()
+        follower = Follow.objects.values('user').order_by('?').first()
+        busiest_post = Post.objects.filter(
+            id__in=Comment.objects.values('post_id')
+        ).first() or Post.objects.first()
+        return {
+            'group': random.choice(groups),
+            'author': random.choice(users),
+            'follower': User.objects.get(pk=follower['user']),
+            'post': busiest_post,
+        }
+
+    def bulk_create(self, model, count, factory):
+        for start in range(0, count, BATCH_SIZE):
+            model.objects.bulk_create(
+                factory() for _ in range(min(BATCH_SIZE, count - start))
+            )
+
+    def targets(self, dataset):
+        return (
+            ('index', reverse('posts:index'), Post.objects.all(), False),
+            (
+                'group_list',
+                reverse('posts:group_list', args=(dataset['group'].slug,)),
+                dataset['group'].posts.all(),
+                False,
+            ),
+            (
+                'profile',
+                reverse('posts:profile', args=(dataset['author'].username,)),
+                dataset['author'].posts.all(),
+                False,
+            ),
+            (
+                'follow_index',
+                reverse('posts:follow_index'),
+                Post.objects.filter(
+                    author__following__user=dataset['follower']
+                ),
+                True,
+            ),
+        )
+
+    def run(self, dataset, options):
+        guest = Client()
+        follower = Client()
+        follower.force_login(dataset['follower'])
+        pages = [int(page) for page in options['pages'].split(',')]
+        results = []
+        for name, url, posts, login in self.targets(dataset):
+            client = follower if login else guest
+            for page in pages:
+                results.append(self.measure(
+                    client, name, url, page, {'page': page}, options
+                ))
+                cursor = self.cursor_at(posts, page)
+                if cursor is not None:
+                    results.append(self.measure(
+                        client, name, url, page, {'cursor': cursor}, options
+                    ))
+        results.append(self.measure(
+            guest,
+            'post_detail',
+            reverse('posts:post_detail', args=(dataset['post'].id,)),
+            1,
+            {},
+            options
+        ))
+        return results
+
+    def cursor_at(self, posts, depth):
+        """Курсор страницы заданной глубины или None, если её нет."""
+        paginator = CursorPaginator(posts, settings.COUNT_POST)
+        cursor = ''
+        for _ in range(depth - 1):
+            page = paginator.get_page(cursor)
+            if not page.has_next():
+                return None
+            cursor = page.next_cursor
+        return cursor
+
+    def measure(self, client, name, url, page, params, options, mode=None):
+        timings = []
+        queries = []
+        status = None
+        for _ in range(options['repeat']):
+            if not options['warm']:
+                cache.clear()
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = client.get(url, params)
+                timings.append((time.perf_counter() - started) * 1000)
+            queries.append(len(captured))
+            status = response.status_code
+        return {
+            'view': name,
+            'mode': mode or ('cursor' if 'cursor' in params else 'page'),
+            'page': page,
+            'status': status,
+            'p50_ms': round(percentile(timings, 0.5), 2),
+            'p95_ms': round(percentile(timings, 0.95), 2),
+            'queries': max(queries),
+        }
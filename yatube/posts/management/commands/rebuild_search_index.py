@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts.models import SearchTerm
+from posts.search import Fts5Backend, get_backend, rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает поисковый индекс постов и комментариев.'
+
+    def handle(self, *args, **options):
+        backend = get_backend()
+        with transaction.atomic():
+            if isinstance(backend, Fts5Backend):
+                backend.execute('DELETE FROM posts_search', [])
+                backend.execute('DELETE FROM posts_comment_search', [])
+            else:
+                SearchTerm.objects.all().delete()
+            rebuild_index(backend)
+        self.stdout.write(f'Индекс {backend.name} перестроен.')
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from posts.stats import recount
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счётчики постов, подписок и комментариев.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'user_ids', nargs='*', type=int,
+            help='id пользователей; по умолчанию все'
+        )
+
+    def handle(self, *args, **options):
+        updated = recount(options['user_ids'] or None)
+        self.stdout.write(f'Пересчитано пользователей: {updated}')
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from posts.images import sweep_images
+
+
+class Command(BaseCommand):
+    help = 'Удаляет картинки постов, на которые больше нет ссылок.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace', type=int,
+            help='секунд с последнего обращения к файлу; '
+                 'по умолчанию POST_IMAGE_SWEEP_GRACE'
+        )
+
+    def handle(self, *args, **options):
+        removed = sweep_images(options['grace'])
+        self.stdout.write(f'Удалено картинок: {removed}')
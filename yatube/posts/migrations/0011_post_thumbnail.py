@@ -0,0 +1,18 @@
+# Generated by Django 2.2.16 on 2026-10-18 03:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0010_auto_20261018_0327'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='thumbnail',
+            field=models.CharField(blank=True, editable=False, help_text='URL миниатюры, заполняется фоновой задачей', max_length=255, verbose_name='Миниатюра'),
+        ),
+    ]
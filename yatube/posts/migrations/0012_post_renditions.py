@@ -0,0 +1,18 @@
+# Generated by Django 2.2.16 on 2026-10-18 03:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0011_post_thumbnail'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='renditions',
+            field=models.TextField(blank=True, editable=False, help_text='JSON-список нарезок: format, width, url', verbose_name='Нарезки картинки'),
+        ),
+    ]
@@ -0,0 +1,103 @@
+import re
+
+from django.db import migrations
+
+# Копия posts.search на момент миграции: код приложения может измениться.
+TOKEN = re.compile(r'\w+')
+COMMENT_WEIGHT = 0.5
+TERM_LENGTH = 64
+BATCH_SIZE = 1000
+
+FTS_TABLES = {
+    'posts_search': 'text',
+    'posts_comment_search': 'text, post_id UNINDEXED',
+}
+
+
+def term_weights(text, weight=1.0):
+    tokens = [
+        token for token in TOKEN.findall(text.lower()) if len(token) > 1
+    ]
+    counts = {}
+    for token in tokens:
+        term = token[:TERM_LENGTH]
+        counts[term] = counts.get(term, 0) + 1
+    return {
+        term: weight * count / len(tokens) for term, count in counts.items()
+    }
+
+
+def fts5_supported(connection):
+    if connection.vendor != 'sqlite':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA compile_options')
+        options = {row[0] for row in cursor.fetchall()}
+    return 'ENABLE_FTS5' in options
+
+
+def build_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if fts5_supported(connection):
+        with connection.cursor() as cursor:
+            for table, columns in FTS_TABLES.items():
+                cursor.execute(
+                    f'CREATE VIRTUAL TABLE IF NOT EXISTS {table} USING fts5('
+                    f"{columns}, tokenize='unicode61 remove_diacritics 2')"
+                )
+            cursor.execute(
+                'INSERT INTO posts_search(rowid, text) '
+                'SELECT id, text FROM posts_post'
+            )
+            cursor.execute(
+                'INSERT INTO posts_comment_search(rowid, text, post_id) '
+                'SELECT id, text, post_id FROM posts_comment '
+                'WHERE post_id IS NOT NULL'
+            )
+        return
+    Post = apps.get_model('posts', 'Post')
+    Comment = apps.get_model('posts', 'Comment')
+    SearchTerm = apps.get_model('posts', 'SearchTerm')
+    rows = []
+
+    def add(terms):
+        # Сбрасываем пачками: на большой таблице список не влезет в память.
+        rows.extend(terms)
+        if len(rows) >= BATCH_SIZE:
+            SearchTerm.objects.bulk_create(rows)
+            rows.clear()
+
+    for post_id, text in Post.objects.values_list('id', 'text').iterator():
+        add(
+            SearchTerm(term=term, post_id=post_id, weight=weight)
+            for term, weight in term_weights(text).items()
+        )
+    comments = Comment.objects.exclude(post=None).values_list(
+        'id', 'post_id', 'text'
+    )
+    for comment_id, post_id, text in comments.iterator():
+        add(
+            SearchTerm(
+                term=term, post_id=post_id, comment_id=comment_id,
+                weight=weight
+            )
+            for term, weight in term_weights(text, COMMENT_WEIGHT).items()
+        )
+    SearchTerm.objects.bulk_create(rows)
+
+
+def drop_index(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        for table in FTS_TABLES:
+            cursor.execute(f'DROP TABLE IF EXISTS {table}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0014_searchterm'),
+    ]
+
+    operations = [
+        migrations.RunPython(build_index, drop_index),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 2.2.16 on 2026-10-18 03:40
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+import django.db.models.deletion
+
+# Копия posts.stats.SOURCES на момент миграции.
+SOURCES = {
+    'posts_count': ('Post', 'author'),
+    'followers_count': ('Follow', 'author'),
+    'following_count': ('Follow', 'user'),
+    'comments_count': ('Comment', 'author'),
+}
+
+
+def fill_stats(apps, schema_editor):
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    UserStats = apps.get_model('posts', 'UserStats')
+    UserStats.objects.bulk_create(
+        (
+            UserStats(user_id=pk)
+            for pk in User.objects.values_list('pk', flat=True).iterator()
+        ),
+        batch_size=1000
+    )
+    counts = {}
+    for field, (model_name, user_field) in SOURCES.items():
+        rows = apps.get_model('posts', model_name).objects.filter(
+            **{user_field: OuterRef('user')}
+        ).order_by().values(user_field).annotate(total=Count('pk'))
+        counts[field] = Coalesce(Subquery(rows.values('total')), 0)
+    UserStats.objects.update(**counts)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0011_update_proxy_permissions'),
+        ('posts', '0016_follow_constraints'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('posts_count', models.PositiveIntegerField(default=0, verbose_name='Постов')),
+                ('followers_count', models.PositiveIntegerField(default=0, verbose_name='Подписчиков')),
+                ('following_count', models.PositiveIntegerField(default=0, verbose_name='Подписок')),
+                ('comments_count', models.PositiveIntegerField(default=0, verbose_name='Комментариев')),
+            ],
+        ),
+        migrations.RunPython(fill_stats, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,12 @@
+import json
+
 from django.contrib.auth import get_user_model
 from django.db import models
 
 from core.models import CreatedModel
 
+from .storage import ContentAddressedStorage
+
 User = get_user_model()
 
 
@@ -46,15 +50,48 @@ class Post(CreatedModel):
     image = models.ImageField(
         'Картинка',
         upload_to='posts/',
+        storage=ContentAddressedStorage(),
         blank=True,
-        null=True
+        null=True,
+        db_index=True
+    )
+    thumbnail = models.CharField(
+        'Миниатюра',
+        max_length=255,
+        blank=True,
+        editable=False,
+        help_text='URL миниатюры, заполняется фоновой задачей'
+    )
+    renditions = models.TextField(
+        'Нарезки картинки',
+        blank=True,
+        editable=False,
+        help_text='JSON-список нарезок: format, width, url'
     )
 
     def __str__(self):
         return self.text[:15]
 
+    @property
+    def image_srcsets(self):
+        """Значения srcset по форматам: {'jpeg': 'url 480w, ...'}."""
+        try:
+            renditions = json.loads(self.renditions or '[]')
+        except ValueError:
+            return {}
+        srcsets = {}
+        for rendition in renditions:
+            srcsets.setdefault(rendition['format'], []).append(
+                '{url} {width}w'.format(**rendition)
+            )
+        return {name: ', '.join(items) for name, items in srcsets.items()}
+
     class Meta:
         ordering = ('-pub_date',)
+        indexes = (
+            models.Index(fields=('author', 'pub_date')),
+            models.Index(fields=('group', 'pub_date')),
+        )
 
 
 class Comment(CreatedModel):
@@ -75,6 +112,11 @@ class Comment(CreatedModel):
         help_text='Введите текст комментария'
     )
 
+    class Meta:
+        indexes = (
+            models.Index(fields=('post', 'created')),
+        )
+
 
 class Follow(models.Model):
     user = models.ForeignKey(
@@ -89,3 +131,52 @@ class Follow(models.Model):
         on_delete=models.CASCADE,
         verbose_name='Автор записей',
     )
+
+    class Meta:
+        constraints = (
+            models.UniqueConstraint(
+                fields=('user', 'author'), name='unique_follow'
+            ),
+        )
+        indexes = (
+            models.Index(fields=('author', 'user')),
+        )
+
+
+class SearchTerm(models.Model):
+    """Строка обратного индекса поиска: термин поста или комментария."""
+
+    term = models.CharField(max_length=64)
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    comment = models.ForeignKey(
+        Comment,
+        on_delete=models.CASCADE,
+        related_name='+',
+        blank=True,
+        null=True
+    )
+    weight = models.FloatField()
+
+    class Meta:
+        indexes = (
+            models.Index(fields=('term', 'post')),
+        )
+
+
+class UserStats(models.Model):
+    """Счётчики пользователя, обновляются сигналами через F()."""
+
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats'
+    )
+    posts_count = models.PositiveIntegerField('Постов', default=0)
+    followers_count = models.PositiveIntegerField('Подписчиков', default=0)
+    following_count = models.PositiveIntegerField('Подписок', default=0)
+    comments_count = models.PositiveIntegerField('Комментариев', default=0)
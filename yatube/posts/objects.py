@@ -0,0 +1,90 @@
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import Http404
+
+from . import versions
+from .models import Group, User
+
+# Вид -> (модель, поле из URL, кешируемые поля; None — все поля).
+KINDS = {
+    'group': (Group, 'slug', None),
+    # Только карточка: хеш пароля и почта в общий кеш не попадают.
+    'user': (User, 'username', ('id', 'username', 'first_name', 'last_name')),
+}
+
+GROUP_CHOICES_VERSION = 'groups'
+
+# Карта объектов текущего запроса; вне запроса — None.
+_local = threading.local()
+
+
+def start_request(**kwargs):
+    _local.objects = {}
+
+
+def end_request(**kwargs):
+    _local.objects = None
+
+
+def identity_map():
+    return getattr(_local, 'objects', None)
+
+
+def version_name(kind, value):
+    return f'object:{kind}:{value}'
+
+
+def object_key(kind, value, version):
+    return f'object:{kind}:{value}:{version}'
+
+
+def get_object(kind, value, fresh=False):
+    """
+    Группа по slug или пользователь по username через кеш.
+
+    В пределах запроса объект загружается один раз; в общем кеше лежит
+    под версионированным ключом, так что устаревшая запись, записанная
+    параллельным запросом после изменения, уже никогда не прочитается.
+    fresh=True — для записей: объект читается из БД и обновляет кеш.
+    """
+    objects = identity_map()
+    if objects is not None and (kind, value) in objects:
+        return objects[kind, value]
+    model, field, fields = KINDS[kind]
+    version, = versions.get_versions(version_name(kind, value))
+    key = object_key(kind, value, version)
+    obj = None if fresh else cache.get(key)
+    if obj is None:
+        queryset = model.objects.all()
+        if fields is not None:
+            queryset = queryset.only(*fields)
+        obj = queryset.filter(**{field: value}).first()
+        if obj is None:
+            raise Http404
+        cache.set(key, obj, settings.OBJECT_CACHE_TIMEOUT)
+    if objects is not None:
+        objects[kind, value] = obj
+    return obj
+
+
+def invalidate(kind, *values):
+    objects = identity_map()
+    for value in values:
+        if objects is not None:
+            objects.pop((kind, value), None)
+    versions.bump(*(version_name(kind, value) for value in values))
+
+
+def group_choices():
+    """Варианты группы для select, общие для всех строк и запросов."""
+    version, = versions.get_versions(GROUP_CHOICES_VERSION)
+    key = f'object:group_choices:{version}'
+    choices = cache.get(key)
+    if choices is None:
+        choices = [('', '---------')] + list(
+            Group.objects.order_by('title').values_list('pk', 'title')
+        )
+        cache.set(key, choices, settings.GROUP_CHOICES_CACHE_TIMEOUT)
+    return choices
@@ -0,0 +1,135 @@
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import Page, Paginator
+from django.db.models import Q
+
+FORWARD = 'n'
+BACKWARD = 'p'
+
+
+class CursorPage(Page):
+    """Страница keyset-пагинации, совместимая с шаблонами для Page."""
+
+    is_cursor = True
+
+    def __init__(self, object_list, paginator, next_cursor=None,
+                 previous_cursor=None):
+        super().__init__(object_list, None, paginator)
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return '<Cursor page>'
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def next_page_number(self):
+        return self.next_cursor
+
+    def previous_page_number(self):
+        return self.previous_cursor
+
+    def start_index(self):
+        return None
+
+    def end_index(self):
+        return None
+
+
+class CursorPaginator(Paginator):
+    """
+    Пагинация по ключу сортировки (seek method).
+
+    Вместо OFFSET и COUNT(*) страница выбирается условием
+    «строго после / до последней показанной записи» по полям ordering,
+    поэтому стоимость запроса не зависит от глубины страницы.
+    Последнее поле ordering должно быть уникальным (обычно id).
+    """
+
+    def __init__(self, object_list, per_page,
+                 ordering=('-pub_date', '-id')):
+        super().__init__(object_list, per_page)
+        self.ordering = tuple(ordering)
+        self.fields = [name.lstrip('-') for name in self.ordering]
+
+    def _check_object_list_is_ordered(self):
+        # Порядок задаёт сам пагинатор через ordering.
+        pass
+
+    def get_page(self, cursor=None):
+        try:
+            return self.page(cursor)
+        except ValueError:
+            return self.page(None)
+
+    def page(self, cursor=None):
+        direction, values = self.decode_cursor(cursor)
+        queryset = self.object_list
+        if values is not None:
+            queryset = queryset.filter(self._seek(values, direction))
+        ordering = self.ordering
+        if direction == BACKWARD:
+            ordering = tuple(self._reverse(name) for name in ordering)
+        rows = list(queryset.order_by(*ordering)[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if direction == BACKWARD:
+            rows.reverse()
+        next_cursor = previous_cursor = None
+        if rows:
+            if has_more or direction == BACKWARD:
+                next_cursor = self.encode_cursor(rows[-1], FORWARD)
+            if values is not None and (has_more or direction == FORWARD):
+                previous_cursor = self.encode_cursor(rows[0], BACKWARD)
+        return CursorPage(rows, self, next_cursor, previous_cursor)
+
+    def encode_cursor(self, obj, direction):
+        values = [
+            self._field(name).value_to_string(obj) for name in self.fields
+        ]
+        raw = json.dumps([direction, values], separators=(',', ':'))
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        if not cursor:
+            return FORWARD, None
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            direction, values = json.loads(raw.decode())
+            if direction not in (FORWARD, BACKWARD):
+                raise ValueError(direction)
+            if len(values) != len(self.fields):
+                raise ValueError(values)
+            return direction, [
+                self._field(name).to_python(value)
+                for name, value in zip(self.fields, values)
+            ]
+        except (binascii.Error, TypeError, UnicodeDecodeError,
+                ValidationError, ValueError):
+            raise ValueError(f'Некорректный курсор: {cursor}')
+
+    def _field(self, name):
+        return self.object_list.model._meta.get_field(name)
+
+    def _seek(self, values, direction):
+        condition = Q()
+        for index, name in enumerate(self.ordering):
+            descending = name.startswith('-')
+            if direction == BACKWARD:
+                descending = not descending
+            lookup = 'lt' if descending else 'gt'
+            equal = dict(zip(self.fields[:index], values[:index]))
+            equal[f'{self.fields[index]}__{lookup}'] = values[index]
+            condition |= Q(**equal)
+        return condition
+
+    @staticmethod
+    def _reverse(name):
+        return name[1:] if name.startswith('-') else f'-{name}'
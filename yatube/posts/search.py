@@ -0,0 +1,259 @@
+import math
+import operator
+import re
+from functools import reduce
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import (Count, FloatField, OuterRef, Q, Subquery, Sum,
+                              Value)
+
+from .counters import post_count
+from .models import Comment, Post, SearchTerm
+
+TOKEN = re.compile(r'\w+')
+COMMENT_WEIGHT = 0.5
+TERM_LENGTH = 64
+
+
+def tokenize(text):
+    return [token for token in TOKEN.findall(text.lower()) if len(token) > 1]
+
+
+def term_weights(text, weight=1.0):
+    """Частоты терминов документа, умноженные на weight."""
+    tokens = tokenize(text)
+    counts = {}
+    for token in tokens:
+        term = token[:TERM_LENGTH]
+        counts[term] = counts.get(term, 0) + 1
+    return {
+        term: weight * count / len(tokens) for term, count in counts.items()
+    }
+
+
+class InvertedIndexBackend:
+    """
+    Обратный индекс на ORM: строки SearchTerm (термин, пост, вес).
+
+    Работает на любой БД. Как и в FTS5, все термины должны найтись
+    в одном документе: тексте поста или одном комментарии. Вес —
+    частота термина в документе; совпадения в комментариях весят
+    COMMENT_WEIGHT. Ранжирование по сумме весов, умноженных на IDF
+    термина.
+    """
+
+    name = 'python'
+
+    def index_post(self, post):
+        SearchTerm.objects.filter(post=post, comment=None).delete()
+        SearchTerm.objects.bulk_create(self.terms(post.text, post.id))
+
+    def index_comment(self, comment):
+        SearchTerm.objects.filter(comment=comment).delete()
+        SearchTerm.objects.bulk_create(self.terms(
+            comment.text, comment.post_id, comment.id, COMMENT_WEIGHT
+        ))
+
+    def remove_post(self, post_id):
+        SearchTerm.objects.filter(post_id=post_id).delete()
+
+    def remove_comment(self, comment_id):
+        SearchTerm.objects.filter(comment_id=comment_id).delete()
+
+    @staticmethod
+    def terms(text, post_id, comment_id=None, weight=1.0):
+        return [
+            SearchTerm(
+                term=term, post_id=post_id, comment_id=comment_id,
+                weight=term_weight
+            )
+            for term, term_weight in term_weights(text, weight).items()
+        ]
+
+    def documents(self, terms):
+        """Пост или комментарий, в котором есть все термины запроса."""
+        return SearchTerm.objects.filter(term__in=terms).values(
+            'post_id', 'comment_id'
+        ).annotate(
+            matched=Count('term', distinct=True)
+        ).filter(matched=len(terms))
+
+    def filter(self, queryset, terms):
+        return queryset.filter(
+            pk__in=self.documents(terms).values('post_id')
+        )
+
+    def search(self, terms, posts, offset, limit):
+        # Для IDF хватает закешированного числа постов.
+        documents = post_count() or 1
+        frequencies = dict(
+            SearchTerm.objects.filter(term__in=terms).values_list(
+                'term'
+            ).annotate(Count('post_id', distinct=True))
+        )
+        score = reduce(operator.add, (
+            Sum('weight', filter=Q(term=term)) * Value(
+                math.log(1 + documents / frequencies.get(term, 1)),
+                output_field=FloatField()
+            )
+            for term in terms
+        ))
+        # Пост ранжируется по лучшему из своих документов, как в FTS5.
+        best = self.documents(terms).filter(
+            post_id=OuterRef('pk')
+        ).annotate(score=score).order_by('-score').values('score')[:1]
+        found = self.filter(posts.order_by(), terms).annotate(
+            score=Subquery(best, output_field=FloatField())
+        ).order_by('-score', '-pk').values_list('pk', flat=True)
+        return list(found[offset:offset + limit])
+
+    def count(self, terms, posts):
+        return self.filter(posts.order_by(), terms).count()
+
+
+class Fts5Backend:
+    """Полнотекстовый индекс SQLite FTS5 с ранжированием bm25."""
+
+    name = 'fts5'
+
+    def execute(self, sql, params):
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+
+    def index_post(self, post):
+        self.remove_post(post.id, comments=False)
+        self.execute(
+            'INSERT INTO posts_search(rowid, text) VALUES (%s, %s)',
+            [post.id, post.text]
+        )
+
+    def index_comment(self, comment):
+        self.remove_comment(comment.id)
+        self.execute(
+            'INSERT INTO posts_comment_search(rowid, text, post_id) '
+            'VALUES (%s, %s, %s)',
+            [comment.id, comment.text, comment.post_id]
+        )
+
+    def remove_post(self, post_id, comments=True):
+        self.execute('DELETE FROM posts_search WHERE rowid = %s', [post_id])
+        if comments:
+            self.execute(
+                'DELETE FROM posts_comment_search WHERE post_id = %s',
+                [post_id]
+            )
+
+    def remove_comment(self, comment_id):
+        self.execute(
+            'DELETE FROM posts_comment_search WHERE rowid = %s', [comment_id]
+        )
+
+    @staticmethod
+    def match_query(terms):
+        return ' '.join('"{}"'.format(term) for term in terms)
+
+    def ranked_sql(self):
+        # Совпадение должно найтись целиком в посте или в одном комментарии.
+        return (
+            'SELECT post_id, MIN(rank) AS rank FROM ('
+            'SELECT rowid AS post_id, bm25(posts_search) AS rank '
+            'FROM posts_search WHERE posts_search MATCH %s '
+            'UNION ALL '
+            'SELECT post_id, bm25(posts_comment_search) * {} AS rank '
+            'FROM posts_comment_search '
+            'WHERE posts_comment_search MATCH %s'
+            ') GROUP BY post_id'
+        ).format(COMMENT_WEIGHT)
+
+    def filter(self, queryset, terms):
+        match = self.match_query(terms)
+        return queryset.extra(
+            where=['{}.id IN (SELECT post_id FROM ({}))'.format(
+                Post._meta.db_table, self.ranked_sql()
+            )],
+            params=[match, match]
+        )
+
+    def found(self, select, terms, posts, tail='', tail_params=()):
+        match = self.match_query(terms)
+        sql, params = posts.order_by().values('id').query.sql_with_params()
+        return self.execute(
+            'SELECT {} FROM ({}) AS found WHERE found.post_id IN ({}){}'
+            .format(select, self.ranked_sql(), sql, tail),
+            [match, match, *params, *tail_params]
+        )
+
+    def search(self, terms, posts, offset, limit):
+        rows = self.found(
+            'found.post_id', terms, posts,
+            ' ORDER BY found.rank, found.post_id DESC LIMIT %s OFFSET %s',
+            (limit, offset)
+        )
+        return [row[0] for row in rows]
+
+    def count(self, terms, posts):
+        return self.found('COUNT(*)', terms, posts)[0][0]
+
+
+# Есть ли таблицы FTS5 в базе: имя БД -> bool.
+_fts_tables = {}
+
+
+def get_backend():
+    name = settings.POST_SEARCH_BACKEND
+    if name == 'auto':
+        database = connection.settings_dict['NAME']
+        if database not in _fts_tables:
+            _fts_tables[database] = (
+                'posts_search' in connection.introspection.table_names()
+            )
+        name = 'fts5' if _fts_tables[database] else 'python'
+    return Fts5Backend() if name == 'fts5' else InvertedIndexBackend()
+
+
+class SearchResults:
+    """
+    Ленивая выборка найденных постов в порядке релевантности.
+
+    Поддерживает count() и срезы, поэтому её можно отдать Paginator.
+    """
+
+    def __init__(self, query, posts=None, backend=None):
+        self.terms = tokenize(query)
+        self.posts = Post.objects.all() if posts is None else posts
+        self.backend = backend or get_backend()
+
+    def count(self):
+        if not self.terms:
+            return 0
+        return self.backend.count(self.terms, self.posts)
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        if not self.terms:
+            return []
+        offset = index.start or 0
+        ids = self.backend.search(
+            self.terms, self.posts, offset, index.stop - offset
+        )
+        found = self.posts.select_related('author', 'group').in_bulk(ids)
+        return [found[pk] for pk in ids if pk in found]
+
+    def filter(self, queryset):
+        """Оставить в queryset только найденные посты (без ранжирования)."""
+        return self.backend.filter(queryset, self.terms)
+
+
+def rebuild_index(backend=None):
+    backend = backend or get_backend()
+    for post in Post.objects.only('id', 'text').iterator():
+        backend.index_post(post)
+    for comment in Comment.objects.only('id', 'text', 'post_id').iterator():
+        if comment.post_id is not None:
+            backend.index_comment(comment)
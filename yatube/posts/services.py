@@ -0,0 +1,15 @@
+from .thumbnails import schedule_thumbnail
+
+
+def save_post(form, author=None):
+    """Сохранить пост из PostForm и поставить в очередь его нарезки."""
+    post = form.save(commit=False)
+    if author is not None:
+        post.author = author
+    image_changed = post.pk is None or 'image' in form.changed_data
+    if image_changed:
+        post.thumbnail = ''
+    post.save()
+    if image_changed:
+        schedule_thumbnail(post)
+    return post
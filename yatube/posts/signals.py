@@ -0,0 +1,227 @@
+from django.conf import settings
+from django.core.signals import request_finished, request_started
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from core.tasks import run_in_background
+
+from . import (
+    counters, feed_ids, feeds, lookups, objects, search, stats, versions
+)
+from .feed_cache import ALL_FEEDS, feed_version_name
+from .models import Comment, Follow, Group, Post, User, UserStats
+
+USER_CARD_FIELDS = {'username', 'first_name', 'last_name'}
+
+AUTHORED_COUNTERS = {Post: 'posts_count', Comment: 'comments_count'}
+
+LOOKUP_KINDS = {
+    model: (kind, field) for kind, (model, field) in lookups.KINDS.items()
+}
+
+OBJECT_KINDS = {
+    model: (kind, field) for kind, (model, field, _) in objects.KINDS.items()
+}
+
+request_started.connect(objects.start_request)
+request_finished.connect(objects.end_request)
+
+
+def changes_user_card(created, update_fields):
+    if created:
+        return False
+    return update_fields is None or bool(USER_CARD_FIELDS & update_fields)
+
+
+@receiver(post_init, sender=Post)
+def remember_post_state(sender, instance, **kwargs):
+    # Через __dict__, чтобы не подгружать отложенные поля.
+    instance._initial_group_id = instance.__dict__.get('group_id')
+
+
+@receiver(post_init, sender=User)
+@receiver(post_init, sender=Group)
+def remember_object_key(sender, instance, **kwargs):
+    kind, field = OBJECT_KINDS[sender]
+    instance._initial_object_key = instance.__dict__.get(field)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=User)
+@receiver(post_delete, sender=Group)
+def invalidate_cached_object(sender, instance, created=False,
+                             update_fields=None, **kwargs):
+    if created:
+        return
+    if sender is User and not changes_user_card(created, update_fields):
+        return
+    kind, field = OBJECT_KINDS[sender]
+    keys = {getattr(instance, field), instance._initial_object_key}
+    objects.invalidate(kind, *keys - {None})
+
+
+@receiver(post_save, sender=Post)
+def update_post_counters(sender, instance, created, **kwargs):
+    if created:
+        counters.post_added(instance)
+    elif instance.group_id != instance._initial_group_id:
+        counters.post_regrouped(instance._initial_group_id, instance.group_id)
+
+
+@receiver(post_delete, sender=Post)
+def remove_post_counters(sender, instance, **kwargs):
+    counters.post_removed(instance)
+
+
+@receiver(post_save, sender=Post)
+def fan_out_post(sender, instance, created, **kwargs):
+    if created and settings.FOLLOW_FEED_MATERIALIZED:
+        run_in_background(feeds.fan_out_post, instance.id, instance.author_id)
+
+
+@receiver(post_save, sender=User)
+def create_user_stats(sender, instance, created, raw, **kwargs):
+    if created and not raw:
+        UserStats.objects.get_or_create(user=instance)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Comment)
+def count_authored(sender, instance, created, **kwargs):
+    if created:
+        stats.change(instance.author_id, **{AUTHORED_COUNTERS[sender]: 1})
+
+
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=Comment)
+def uncount_authored(sender, instance, **kwargs):
+    stats.change(instance.author_id, **{AUTHORED_COUNTERS[sender]: -1})
+
+
+@receiver(post_save, sender=Follow)
+def count_follow(sender, instance, created, **kwargs):
+    if created:
+        stats.change(instance.user_id, following_count=1)
+        stats.change(instance.author_id, followers_count=1)
+
+
+@receiver(post_delete, sender=Follow)
+def uncount_follow(sender, instance, **kwargs):
+    stats.change(instance.user_id, following_count=-1)
+    stats.change(instance.author_id, followers_count=-1)
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def invalidate_profile_feed(sender, instance, **kwargs):
+    # В кешированных профилях выводятся число подписчиков автора
+    # и число подписок подписчика.
+    usernames = User.objects.filter(
+        pk__in=(instance.author_id, instance.user_id)
+    ).values_list('username', flat=True)
+    versions.bump(*(
+        feed_version_name('profile', username) for username in usernames
+    ))
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def drop_follow_feed(sender, instance, **kwargs):
+    if settings.FOLLOW_FEED_MATERIALIZED:
+        feeds.drop_feed(instance.user_id)
+
+
+@receiver(post_delete, sender=Follow)
+def drop_follower_feeds(sender, instance, **kwargs):
+    if settings.FOLLOW_FEED_MATERIALIZED:
+        run_in_background(feeds.drop_follower_feeds, instance.author_id)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def bump_post_version(sender, instance, **kwargs):
+    versions.bump(f'post:{instance.pk}')
+
+
+@receiver(post_save, sender=User)
+def bump_user_version(sender, instance, created, update_fields, **kwargs):
+    # Вход пользователя обновляет только last_login — карточки не меняются.
+    if changes_user_card(created, update_fields):
+        versions.bump(f'user:{instance.pk}', ALL_FEEDS)
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def bump_group_version(sender, instance, **kwargs):
+    versions.bump(
+        f'group:{instance.pk}', ALL_FEEDS, objects.GROUP_CHOICES_VERSION
+    )
+
+
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=Group)
+@receiver(post_save, sender=Post)
+def remember_lookup_key(sender, instance, raw, update_fields, **kwargs):
+    kind, field = LOOKUP_KINDS[sender]
+    # Ключ поиска не менялся — например, вход обновил только last_login.
+    if raw or update_fields is not None and field not in update_fields:
+        return
+    lookups.remember(kind, getattr(instance, field))
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_feeds(sender, instance, **kwargs):
+    group_ids = {instance.group_id, instance._initial_group_id} - {None}
+    slugs = Group.objects.filter(pk__in=group_ids).values_list(
+        'slug', flat=True
+    )
+    versions.bump(
+        feed_version_name('index'),
+        feed_version_name('profile', instance.author.username),
+        *(feed_version_name('group', slug) for slug in slugs)
+    )
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_feed_ids(sender, instance, signal, created=False, **kwargs):
+    # Правка текста состав лент не меняет.
+    moved = instance.group_id != instance._initial_group_id
+    if signal is post_delete or created or moved:
+        feed_ids.post_changed(instance)
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def invalidate_following_ids(sender, instance, **kwargs):
+    feed_ids.follow_changed(instance.user_id)
+
+
+@receiver(post_save, sender=Post)
+def index_post(sender, instance, update_fields, **kwargs):
+    if update_fields is None or 'text' in update_fields:
+        search.get_backend().index_post(instance)
+
+
+@receiver(post_delete, sender=Post)
+def unindex_post(sender, instance, **kwargs):
+    search.get_backend().remove_post(instance.pk)
+
+
+@receiver(post_save, sender=Comment)
+def index_comment(sender, instance, **kwargs):
+    if instance.post_id is not None:
+        search.get_backend().index_comment(instance)
+
+
+@receiver(post_delete, sender=Comment)
+def unindex_comment(sender, instance, **kwargs):
+    search.get_backend().remove_comment(instance.pk)
+
+
+# Должен оставаться последним обработчиком post_save для Post.
+@receiver(post_save, sender=Post)
+def reset_post_state(sender, instance, **kwargs):
+    instance._initial_group_id = instance.group_id
@@ -0,0 +1,57 @@
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import Comment, Follow, Post, User, UserStats
+
+# Поле счётчика -> (модель, поле со ссылкой на пользователя).
+SOURCES = {
+    'posts_count': (Post, 'author'),
+    'followers_count': (Follow, 'author'),
+    'following_count': (Follow, 'user'),
+    'comments_count': (Comment, 'author'),
+}
+
+
+def change(user_id, **deltas):
+    """Атомарно изменить счётчики пользователя: change(1, posts_count=1)."""
+    # Разошедшийся счётчик не уводим ниже нуля — его поправит recount.
+    UserStats.objects.filter(user_id=user_id, **{
+        f'{field}__gte': -delta for field, delta in deltas.items() if delta < 0
+    }).update(**{
+        field: F(field) + delta for field, delta in deltas.items()
+    })
+
+
+def recount(user_ids=None):
+    """
+    Пересчитать счётчики пользователей одним UPDATE на все записи.
+
+    Недостающие строки создаются.
+    """
+    users = User.objects.all()
+    if user_ids is not None:
+        users = users.filter(pk__in=user_ids)
+    missing = users.filter(stats=None).values_list('pk', flat=True)
+    UserStats.objects.bulk_create(
+        (UserStats(user_id=pk) for pk in missing.iterator()),
+        batch_size=1000
+    )
+    counts = {}
+    for field, (model, user_field) in SOURCES.items():
+        rows = model.objects.filter(
+            **{user_field: OuterRef('user')}
+        ).order_by().values(user_field).annotate(total=Count('pk'))
+        counts[field] = Coalesce(Subquery(rows.values('total')), 0)
+    stats = UserStats.objects.all()
+    if user_ids is not None:
+        stats = stats.filter(user_id__in=user_ids)
+    return stats.update(**counts)
+
+
+def get_stats(user):
+    """Счётчики пользователя; отсутствующая строка считается на месте."""
+    try:
+        return user.stats
+    except UserStats.DoesNotExist:
+        recount([user.pk])
+        return UserStats.objects.get(user=user)
@@ -0,0 +1,133 @@
+import hashlib
+import os
+import re
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.utils.crypto import get_random_string
+from django.utils.deconstruct import deconstructible
+
+BLOB_NAME = re.compile(r'(^|/)[0-9a-f]{2}/[0-9a-f]{64}(\.\w+)?$')
+
+
+def touch(storage, name):
+    """
+    Отметить файл как снова используемый; False, если файла нет.
+
+    По mtime sweep_images отличает файлы, к которым только что
+    обратились, от брошенных.
+    """
+    try:
+        os.utime(storage.path(name))
+    except FileNotFoundError:
+        return False
+    return True
+
+
+def make_directory(storage, path):
+    directory = os.path.dirname(path)
+    if storage.directory_permissions_mode is not None:
+        old_umask = os.umask(0)
+        try:
+            os.makedirs(
+                directory, storage.directory_permissions_mode, exist_ok=True
+            )
+        finally:
+            os.umask(old_umask)
+    else:
+        os.makedirs(directory, exist_ok=True)
+
+
+def link_file(storage, source, name):
+    """Поставить готовый файл source под именем name жёсткой ссылкой."""
+    path = storage.path(name)
+    try:
+        os.link(source, path)
+    except FileExistsError:
+        touch(storage, name)
+        return
+    if storage.file_permissions_mode is not None:
+        os.chmod(path, storage.file_permissions_mode)
+
+
+def save_exact(storage, name, content):
+    """
+    Сохранить content ровно под именем name, без суффиксов _AbCdEfG.
+
+    Загрузка во временном файле на том же диске (MEDIA_ROOT/tmp)
+    ставится на место ссылкой, без копирования. Содержимое в памяти
+    пишется во временный файл рядом и тоже переносится ссылкой.
+    Если файл уже создал параллельный запрос, остаётся тот: имя
+    выводится из содержимого, поэтому файлы одинаковые.
+    """
+    path = storage.path(name)
+    make_directory(storage, path)
+    if hasattr(content, 'temporary_file_path'):
+        try:
+            link_file(storage, content.temporary_file_path(), name)
+            return name
+        except OSError:
+            # Другой диск или ФС без жёстких ссылок — копируем.
+            pass
+    if not hasattr(content, 'chunks'):
+        content = File(content, name)
+    temp_path = f'{path}.{get_random_string(7)}.tmp'
+    fd = os.open(
+        temp_path,
+        os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0),
+        0o666
+    )
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            for chunk in content.chunks():
+                file.write(chunk)
+        if storage.file_permissions_mode is not None:
+            os.chmod(temp_path, storage.file_permissions_mode)
+        link_file(storage, temp_path, name)
+    finally:
+        os.unlink(temp_path)
+    return name
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Хранилище, которое кладёт файл по sha256 его содержимого.
+
+    Одинаковые загрузки превращаются в один файл
+    <upload_to>/<2 символа хеша>/<хеш>.<расширение>; повторное
+    сохранение того же содержимого ничего не пишет на диск, а только
+    обновляет mtime файла. Хеш берётся из атрибута content_hash
+    загрузки, если он уже посчитан.
+    """
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        name = self.blob_name(name, self.content_hash(content))
+        if touch(self, name):
+            return name
+        return save_exact(self, name, content)
+
+    @staticmethod
+    def content_hash(content):
+        digest = getattr(content, 'content_hash', None)
+        if digest:
+            return digest
+        sha256 = hashlib.sha256()
+        for chunk in content.chunks():
+            sha256.update(chunk)
+        content.seek(0)
+        return sha256.hexdigest()
+
+    @staticmethod
+    def blob_name(name, digest):
+        directory, basename = os.path.split(name)
+        extension = os.path.splitext(basename)[1].lower()
+        return os.path.join(directory, digest[:2], digest + extension)
+
+    @staticmethod
+    def is_blob(name):
+        return bool(name and BLOB_NAME.search(name))
@@ -0,0 +1,16 @@
+from django import template
+
+from ..models import Follow
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def is_following(context, username):
+    """Подписан ли текущий пользователь на автора username."""
+    user = context.get('user')
+    if user is None or not user.is_authenticated:
+        return False
+    return Follow.objects.filter(
+        user=user, author__username=username
+    ).exists()
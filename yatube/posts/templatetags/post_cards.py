@@ -0,0 +1,14 @@
+from django import template
+
+from ..versions import get_versions
+
+register = template.Library()
+
+
+@register.simple_tag
+def post_card_version(post):
+    """Версия карточки поста: меняется вместе с постом, автором и группой."""
+    names = [f'post:{post.pk}', f'user:{post.author_id}']
+    if post.group_id is not None:
+        names.append(f'group:{post.group_id}')
+    return '.'.join(str(version) for version in get_versions(*names))
@@ -0,0 +1,83 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.counters import EstimatedCountPaginator
+from posts.models import Group, Post, User
+
+URL = reverse('admin:posts_post_changelist')
+
+
+class PostAdminTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(
+            'admin', 'admin@example.com', 'password'
+        )
+        cls.groups = [
+            Group.objects.create(
+                title=f'Группа {i}', slug=f'slug-{i}', description='Описание'
+            )
+            for i in range(3)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.admin)
+
+    def create_posts(self, count):
+        Post.objects.bulk_create(
+            Post(author=self.admin, group=self.groups[i % 3], text=f'Пост {i}')
+            for i in range(count)
+        )
+
+    def count_queries(self, params=None):
+        self.client.get(URL, params)
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(URL, params)
+        self.assertEqual(response.status_code, 200)
+        return len(captured), response
+
+    def test_queries_do_not_grow_with_rows(self):
+        """Число запросов не зависит от числа строк на странице."""
+        self.create_posts(2)
+        few, _ = self.count_queries()
+        self.create_posts(40)
+        many, response = self.count_queries()
+        self.assertEqual(few, many)
+        post = Post.objects.filter(group=self.groups[2]).first()
+        self.assertContains(
+            response,
+            '<select id="id_form-0-group" name="form-0-group">', count=1
+        )
+        self.assertContains(
+            response, f'<option value="{post.group_id}" selected>'
+        )
+
+    def test_full_count_is_not_computed(self):
+        """Полный COUNT(*) по таблице при поиске не выполняется."""
+        self.create_posts(5)
+        _, response = self.count_queries({'q': 'Пост'})
+        self.assertIsNone(response.context['cl'].full_result_count)
+
+    def test_group_choices_follow_group_changes(self):
+        """Новая группа сразу появляется в списке выбора."""
+        self.create_posts(1)
+        self.count_queries()
+        Group.objects.create(title='Новая группа', slug='new', description='')
+        _, response = self.count_queries()
+        self.assertContains(response, 'Новая группа')
+
+    def test_estimated_count_is_capped_for_filters(self):
+        """Отфильтрованный список считается не дальше лимита."""
+        self.create_posts(15)
+        with self.settings(ESTIMATED_COUNT_LIMIT=10):
+            paginator = EstimatedCountPaginator(
+                Post.objects.filter(text__startswith='Пост'), 5
+            )
+            self.assertEqual(paginator.count, 10)
+        paginator = EstimatedCountPaginator(Post.objects.all(), 5)
+        self.assertEqual(paginator.count, 15)
@@ -0,0 +1,49 @@
+import json
+from io import StringIO
+
+from django.core.management import call_command
+from django.db.models import Count
+from django.test import TestCase
+
+from posts.models import UserStats
+
+
+class BenchFeedsCommandTests(TestCase):
+    def test_bench_feeds_reports_all_views(self):
+        """Команда bench_feeds выдаёт JSON-отчёт по всем лентам."""
+        out = StringIO()
+        call_command(
+            'bench_feeds', '--use-current-db', '--users=5', '--groups=2',
+            '--posts=30', '--comments=10', '--follows=10', '--pages=1,2',
+            '--repeat=2', stdout=out
+        )
+        report = json.loads(out.getvalue())
+        views = {result['view'] for result in report['results']}
+        self.assertEqual(views, {
+            'index', 'group_list', 'profile', 'follow_index', 'post_detail'
+        })
+        for result in report['results']:
+            with self.subTest(result=result):
+                self.assertEqual(result['status'], 200)
+                self.assertLessEqual(result['p50_ms'], result['p95_ms'])
+        stats = UserStats.objects.annotate(
+            posts=Count('user__posts', distinct=True)
+        ).values_list('posts_count', 'posts')
+        for posts_count, posts in stats:
+            self.assertEqual(posts_count, posts)
+
+    def test_bench_admin_reports_changelist(self):
+        """Команда bench_admin замеряет список постов в админке."""
+        out = StringIO()
+        call_command(
+            'bench_admin', '--use-current-db', '--users=5', '--groups=2',
+            '--posts=30', '--comments=10', '--follows=10', '--pages=1,2',
+            '--repeat=2', stdout=out
+        )
+        report = json.loads(out.getvalue())
+        modes = {result['mode'] for result in report['results']}
+        self.assertEqual(modes, {'page', 'search', 'filter'})
+        for result in report['results']:
+            with self.subTest(result=result):
+                self.assertEqual(result['view'], 'post_changelist')
+                self.assertEqual(result['status'], 200)
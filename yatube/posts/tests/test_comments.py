@@ -0,0 +1,71 @@
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Comment, Post
+
+User = get_user_model()
+
+COMMENTS_COUNT = 5
+PER_PAGE = 2
+
+
+@override_settings(COUNT_COMMENT=PER_PAGE)
+class CommentPaginationTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='hasnoname')
+        cls.post = Post.objects.create(
+            author=cls.user,
+            text='Тестовый текст для поста',
+        )
+        Comment.objects.bulk_create(
+            Comment(post=cls.post, author=cls.user, text=f'Комментарий {i}')
+            for i in range(COMMENTS_COUNT)
+        )
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def test_post_detail_shows_first_comments_page(self):
+        """На странице поста выводится только первая порция комментариев."""
+        response = self.guest_client.get(
+            reverse('posts:post_detail', kwargs={'post_id': self.post.id})
+        )
+        comments = response.context['comments']
+        self.assertEqual(
+            [comment.text for comment in comments],
+            ['Комментарий 0', 'Комментарий 1']
+        )
+        self.assertContains(response, comments.next_cursor)
+
+    def test_comments_json_walks_all_pages(self):
+        """JSON-эндпоинт отдаёт все комментарии по ссылкам next."""
+        url = reverse('posts:comments', kwargs={'post_id': self.post.id})
+        url += '?format=json'
+        texts = []
+        while url:
+            data = self.guest_client.get(url).json()
+            texts += [comment['text'] for comment in data['comments']]
+            url = data['next']
+        self.assertEqual(
+            texts, [f'Комментарий {i}' for i in range(COMMENTS_COUNT)]
+        )
+
+    def test_comments_fragment(self):
+        """HTML-фрагмент комментариев рендерится без базового шаблона."""
+        response = self.guest_client.get(
+            reverse('posts:comments', kwargs={'post_id': self.post.id})
+        )
+        self.assertTemplateUsed(response, 'posts/includes/comments.html')
+        self.assertTemplateNotUsed(response, 'base.html')
+
+    def test_comments_of_missing_post(self):
+        """Комментарии несуществующего поста возвращают 404."""
+        response = self.guest_client.get(
+            reverse('posts:comments', kwargs={'post_id': 0})
+        )
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
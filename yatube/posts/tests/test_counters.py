@@ -0,0 +1,88 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.counters import CountedPaginator, post_count
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class PostCountersTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='hasnoname')
+        cls.group = Group.objects.create(
+            title='Название группы для теста',
+            slug='test-slug',
+            description='Тестовое описание группы'
+        )
+        cls.another_group = Group.objects.create(
+            title='Другая группа',
+            slug='another-slug',
+            description='Тестовое описание другой группы'
+        )
+        cls.post = Post.objects.create(
+            author=cls.user,
+            text='Тестовый текст для поста',
+            group=cls.group,
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_counters_follow_create_and_delete(self):
+        """Счётчики обновляются при создании и удалении поста."""
+        self.assertEqual(post_count(), 1)
+        self.assertEqual(post_count(author_id=self.user.id), 1)
+        self.assertEqual(post_count(group_id=self.group.id), 1)
+        post = Post.objects.create(
+            author=self.user, text='Ещё пост', group=self.group
+        )
+        with self.assertNumQueries(0):
+            self.assertEqual(post_count(), 2)
+            self.assertEqual(post_count(author_id=self.user.id), 2)
+            self.assertEqual(post_count(group_id=self.group.id), 2)
+        post.delete()
+        with self.assertNumQueries(0):
+            self.assertEqual(post_count(), 1)
+            self.assertEqual(post_count(group_id=self.group.id), 1)
+
+    def test_counters_follow_group_change(self):
+        """Смена группы переносит пост между счётчиками групп."""
+        self.assertEqual(post_count(group_id=self.group.id), 1)
+        self.assertEqual(post_count(group_id=self.another_group.id), 0)
+        post = Post.objects.get(pk=self.post.pk)
+        post.group = self.another_group
+        post.save()
+        self.assertEqual(post_count(group_id=self.group.id), 0)
+        self.assertEqual(post_count(group_id=self.another_group.id), 1)
+
+    @override_settings(LOCAL_CACHE_TIMEOUT=0)
+    def test_local_cache_bounds_counter_lifetime(self):
+        """В LocMem счётчик живёт не дольше LOCAL_CACHE_TIMEOUT."""
+        post_count()
+        with self.assertNumQueries(1):
+            self.assertEqual(post_count(), 1)
+
+    def test_paginator_uses_given_count(self):
+        """CountedPaginator не выполняет COUNT(*), если число известно."""
+        paginator = CountedPaginator(Post.objects.all(), 10, count=1)
+        with self.assertNumQueries(1):
+            self.assertEqual(len(paginator.get_page(1)), 1)
+
+    def test_profile_counts_posts_once(self):
+        """Профиль не выполняет COUNT(*) при закешированном числе."""
+        url = reverse('posts:profile', kwargs={'username': self.user})
+        client = Client()
+        client.force_login(self.user)
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url)
+        self.assertEqual(response.context['posts_count'], 1)
+        self.assertFalse(
+            any('COUNT(' in query['sql'] for query in queries.captured_queries)
+        )
@@ -0,0 +1,80 @@
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Comment, Group, Post
+
+User = get_user_model()
+
+
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='hasnoname')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.user,
+            group=cls.group,
+            text='Тестовый текст для поста',
+        )
+        cls.urls = {
+            'post_detail': (
+                reverse('posts:post_detail', args=(cls.post.id,)), 1
+            ),
+            'profile': (reverse('posts:profile', args=(cls.user,)), 0),
+            'group_list': (
+                reverse('posts:group_list', args=(cls.group.slug,)), 0
+            ),
+        }
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def etag(self, url):
+        response = self.guest_client.get(url)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        return response['ETag']
+
+    def test_not_modified(self):
+        """Совпавший ETag даёт 304 без шаблонов и почти без запросов."""
+        for name, (url, queries) in self.urls.items():
+            with self.subTest(view=name):
+                etag = self.etag(url)
+                with self.assertNumQueries(queries):
+                    response = self.guest_client.get(
+                        url, HTTP_IF_NONE_MATCH=etag
+                    )
+                self.assertEqual(
+                    response.status_code, HTTPStatus.NOT_MODIFIED
+                )
+                self.assertFalse(response.content)
+
+    def test_etag_changes_with_content(self):
+        """ETag меняется после правки поста и нового комментария."""
+        etags = {name: self.etag(url) for name, (url, _) in self.urls.items()}
+        post = Post.objects.get(pk=self.post.pk)
+        post.text = 'Исправленный текст'
+        post.save()
+        for name, (url, _) in self.urls.items():
+            with self.subTest(view=name):
+                self.assertNotEqual(self.etag(url), etags[name])
+        url = self.urls['post_detail'][0]
+        etag = self.etag(url)
+        Comment.objects.create(post=self.post, author=self.user, text='Ок')
+        self.assertNotEqual(self.etag(url), etag)
+
+    def test_etag_depends_on_user(self):
+        """У гостя и пользователя разные ETag одной страницы."""
+        url = self.urls['profile'][0]
+        client = Client()
+        client.force_login(self.user)
+        self.assertNotEqual(client.get(url)['ETag'], self.etag(url))
@@ -0,0 +1,142 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core.cache import shared_timeout
+from posts.feed_cache import get_stats
+from posts.models import Follow, Group, Post
+
+User = get_user_model()
+
+
+class FeedCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='hasnoname')
+        cls.group = Group.objects.create(
+            title='Название группы для теста',
+            slug='test-slug',
+            description='Тестовое описание группы'
+        )
+        cls.post = Post.objects.create(
+            author=cls.user,
+            text='Тестовый текст для поста',
+            group=cls.group,
+        )
+        cls.feed_urls = {
+            'index': reverse('posts:index'),
+            'group': reverse(
+                'posts:group_list', kwargs={'slug': cls.group.slug}
+            ),
+            'profile': reverse(
+                'posts:profile', kwargs={'username': cls.user.username}
+            ),
+        }
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_feeds_are_cached_for_guests(self):
+        """Ленты для гостей отдаются из кеша и считают попадания."""
+        for feed, url in self.feed_urls.items():
+            with self.subTest(feed=feed):
+                self.guest_client.get(url)
+                with self.assertNumQueries(0):
+                    response = self.guest_client.get(url)
+                self.assertEqual(
+                    get_stats(feed)[feed], {'hits': 1, 'misses': 1}
+                )
+                self.assertTemplateNotUsed(response, 'base.html')
+
+    def test_feed_pages_are_cached_separately(self):
+        """Разные страницы ленты кешируются под разными ключами."""
+        url = self.feed_urls['index']
+        self.guest_client.get(url)
+        self.guest_client.get(url, {'page': 2})
+        self.assertEqual(get_stats('index')['index']['misses'], 2)
+
+    def test_unrelated_params_share_cached_page(self):
+        """Посторонние параметры запроса не создают новых записей кеша."""
+        url = self.feed_urls['index']
+        self.guest_client.get(url, {'page': 1})
+        self.guest_client.get(url, {'page': 1, 'utm_source': 'mail'})
+        self.assertEqual(
+            get_stats('index')['index'], {'hits': 1, 'misses': 1}
+        )
+
+    def test_local_cache_keeps_pages_briefly(self):
+        """С LocMem страницы и версии живут не дольше LOCAL_CACHE_TIMEOUT."""
+        self.assertEqual(shared_timeout(60 * 60), 20)
+        self.assertEqual(shared_timeout(None), 20)
+        self.assertEqual(shared_timeout(5), 5)
+        with override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+        }}, LOCAL_CACHE_TIMEOUT=7):
+            self.assertEqual(shared_timeout(None), 7)
+        with override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': '/nonexistent',
+        }}):
+            self.assertIsNone(shared_timeout(None))
+
+    @override_settings(DEBUG=False)
+    def test_missing_feed_page_has_navbar(self):
+        """Страница 404 для несуществующих группы и профиля без меток."""
+        for url in (
+            reverse('posts:group_list', kwargs={'slug': 'nope'}),
+            reverse('posts:profile', kwargs={'username': 'nope'}),
+        ):
+            with self.subTest(url=url):
+                response = self.authorized_client.get(url)
+                self.assertEqual(response.status_code, 404)
+                self.assertNotContains(response, '<!--hole:', status_code=404)
+                self.assertContains(response, 'navbar', status_code=404)
+
+    def test_users_share_cached_pages(self):
+        """Гости и пользователи читают одну запись кеша со своей шапкой."""
+        for feed, url in self.feed_urls.items():
+            with self.subTest(feed=feed):
+                guest_response = self.guest_client.get(url)
+                response = self.authorized_client.get(url)
+                self.assertEqual(
+                    get_stats(feed)[feed], {'hits': 1, 'misses': 1}
+                )
+                self.assertContains(response, 'Пользователь: hasnoname')
+                self.assertNotContains(response, '<!--hole:')
+                self.assertNotContains(guest_response, 'Пользователь:')
+
+    def test_follow_button_is_personal(self):
+        """Кнопка подписки в закешированном профиле своя у каждого."""
+        url = self.feed_urls['profile']
+        reader = User.objects.create_user(username='reader')
+        reader_client = Client()
+        reader_client.force_login(reader)
+        self.assertNotContains(self.authorized_client.get(url), 'Подписаться')
+        self.assertContains(reader_client.get(url), 'Подписаться')
+        Follow.objects.create(user=reader, author=self.user)
+        self.assertContains(reader_client.get(url), 'Отписаться')
+
+    def test_new_post_invalidates_feeds(self):
+        """Новый пост сразу появляется во всех затронутых лентах."""
+        for url in self.feed_urls.values():
+            self.guest_client.get(url)
+        Post.objects.create(
+            author=self.user, text='Свежий пост', group=self.group
+        )
+        for feed, url in self.feed_urls.items():
+            with self.subTest(feed=feed):
+                self.assertContains(self.guest_client.get(url), 'Свежий пост')
+
+    def test_group_change_invalidates_old_group(self):
+        """Перенос поста в другую группу сбрасывает кеш старой группы."""
+        url = self.feed_urls['group']
+        self.assertContains(self.guest_client.get(url), self.post.text)
+        post = Post.objects.get(pk=self.post.pk)
+        post.group = None
+        post.save()
+        self.assertNotContains(self.guest_client.get(url), self.post.text)
@@ -0,0 +1,85 @@
+from array import array
+
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.test import TestCase, override_settings
+
+from posts.feed_ids import FeedIds
+from posts.models import Follow, Group, Post, User
+
+POSTS_COUNT = 12
+
+
+class FeedIdsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='auth')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Тестовая группа', slug='test-slug',
+            description='Тестовое описание'
+        )
+        for i in range(POSTS_COUNT):
+            Post.objects.create(
+                author=cls.author, group=cls.group, text=f'Пост {i}'
+            )
+
+    def setUp(self):
+        cache.clear()
+        self.posts = Post.objects.select_related('author', 'group')
+
+    def expected(self, queryset=None):
+        queryset = self.posts if queryset is None else queryset
+        return list(queryset.values_list('id', flat=True))
+
+    def test_ids_are_cached_as_array(self):
+        """Лента хранится массивом id и повторно читается без БД."""
+        expected = self.expected()
+        feed = FeedIds.index(self.posts)
+        self.assertIsInstance(feed.ids, array)
+        self.assertEqual(list(feed.ids), expected)
+        with self.assertNumQueries(0):
+            self.assertEqual(list(FeedIds.index(self.posts).ids), expected)
+
+    def test_page_is_hydrated_with_one_query(self):
+        """Страница собирается одним in_bulk в порядке ленты."""
+        FeedIds.index(self.posts).ids
+        paginator = Paginator(FeedIds.index(self.posts), 5)
+        with self.assertNumQueries(1):
+            page = paginator.page(2)
+            ids = [post.id for post in page]
+        self.assertEqual(ids, self.expected()[5:10])
+
+    def test_edits_keep_ids_and_new_posts_reset_them(self):
+        """Правки не сбрасывают список, новый пост — сбрасывает."""
+        key = FeedIds.group(self.posts, self.group.id).key
+        post = Post.objects.get(text='Пост 0')
+        post.text = 'Исправленный пост'
+        post.save()
+        self.author.first_name = 'Имя'
+        self.author.save()
+        self.assertEqual(FeedIds.group(self.posts, self.group.id).key, key)
+        Post.objects.create(author=self.author, group=self.group, text='Ещё')
+        self.assertNotEqual(
+            FeedIds.group(self.posts, self.group.id).key, key
+        )
+
+    def test_follow_feed_tracks_follows(self):
+        """Подписка меняет состав ленты подписок."""
+        posts = self.posts.filter(author__following__user=self.reader)
+        self.assertEqual(list(FeedIds.follow(posts, self.reader.id).ids), [])
+        Follow.objects.create(user=self.reader, author=self.author)
+        self.assertEqual(
+            list(FeedIds.follow(posts, self.reader.id).ids),
+            self.expected(posts)
+        )
+
+    @override_settings(FEED_IDS_LENGTH=5)
+    def test_deep_pages_fall_back_to_queryset(self):
+        """Страницы дальше сохранённого списка читаются из queryset."""
+        feed = FeedIds.index(self.posts)
+        self.assertEqual(len(feed.ids), 5)
+        self.assertEqual(feed.count(), POSTS_COUNT)
+        self.assertEqual(
+            [post.id for post in feed[5:10]], self.expected()[5:10]
+        )
@@ -0,0 +1,90 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core.cache import lock_key
+from posts.feeds import fan_out_post, feed_key
+from posts.models import Follow, Post
+
+User = get_user_model()
+
+
+@override_settings(
+    FOLLOW_FEED_MATERIALIZED=True,
+    BACKGROUND_TASKS_EAGER=True,
+    FOLLOW_FEED_FANOUT_LIMIT=1,
+)
+class MaterializedFollowFeedTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='hasnoname')
+        cls.another_user = User.objects.create_user(username='noname')
+        cls.author = User.objects.create_user(username='idol')
+        cls.celebrity = User.objects.create_user(username='celebrity')
+        Follow.objects.create(user=cls.user, author=cls.author)
+        Follow.objects.create(user=cls.user, author=cls.celebrity)
+        Follow.objects.create(user=cls.another_user, author=cls.celebrity)
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def get_feed(self):
+        response = self.authorized_client.get(reverse('posts:follow_index'))
+        return list(response.context['page_obj'])
+
+    def test_new_post_is_pushed_into_follower_feed(self):
+        """Новый пост попадает в уже собранную ленту подписчика."""
+        self.assertEqual(self.get_feed(), [])
+        post = Post.objects.create(author=self.author, text='Новый пост')
+        self.assertEqual(cache.get(feed_key(self.user.id)), [post.id])
+        self.assertEqual(self.get_feed(), [post])
+
+    def test_celebrity_posts_are_read_on_demand(self):
+        """Посты авторов с большим числом подписчиков читаются из БД."""
+        self.assertEqual(self.get_feed(), [])
+        post = Post.objects.create(author=self.celebrity, text='Пост звезды')
+        self.assertEqual(cache.get(feed_key(self.user.id)), [])
+        self.assertEqual(self.get_feed(), [post])
+
+    def test_feed_is_dropped_when_author_falls_below_limit(self):
+        """
+        Автор вернулся под порог — ленты подписчиков пересобираются.
+
+        Его посты, не разосланные раньше, иначе пропали бы из лент.
+        """
+        self.get_feed()
+        post = Post.objects.create(author=self.celebrity, text='Пост звезды')
+        Follow.objects.filter(user=self.another_user).delete()
+        self.assertIsNone(cache.get(feed_key(self.user.id)))
+        self.assertEqual(self.get_feed(), [post])
+
+    @override_settings(CACHE_LOCK_TIMEOUT=0.1)
+    def test_locked_feed_is_dropped(self):
+        """Ленту, которую не удалось заблокировать, сбрасываем целиком."""
+        self.get_feed()
+        key = feed_key(self.user.id)
+        cache.add(lock_key(key), True)
+        post = Post.objects.create(author=self.author, text='Новый пост')
+        self.assertIsNone(cache.get(key))
+        cache.delete(lock_key(key))
+        self.assertEqual(self.get_feed(), [post])
+
+    def test_fan_out_is_idempotent(self):
+        """Повторная рассылка не дублирует пост в ленте."""
+        self.get_feed()
+        post = Post.objects.create(author=self.author, text='Новый пост')
+        fan_out_post(post.id, self.author.id)
+        self.assertEqual(cache.get(feed_key(self.user.id)), [post.id])
+
+    def test_unfollow_rebuilds_feed(self):
+        """После отписки посты автора пропадают из ленты."""
+        Post.objects.create(author=self.author, text='Новый пост')
+        self.assertEqual(len(self.get_feed()), 1)
+        self.authorized_client.get(reverse(
+            'posts:profile_unfollow', kwargs={'username': self.author}
+        ))
+        self.assertEqual(self.get_feed(), [])
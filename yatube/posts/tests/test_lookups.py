@@ -0,0 +1,125 @@
+import shutil
+import tempfile
+
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts import lookups
+from posts.models import Group, Post, User
+
+SHARED_CACHE_LOCATION = tempfile.mkdtemp()
+
+
+@override_settings(BACKGROUND_TASKS_EAGER=True, CACHES={'default': {
+    'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+    'LOCATION': SHARED_CACHE_LOCATION,
+}})
+class NegativeLookupTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(SHARED_CACHE_LOCATION, ignore_errors=True)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа', slug='test-slug',
+            description='Тестовое описание'
+        )
+        cls.post = Post.objects.create(author=cls.user, text='Тестовый пост')
+
+    def setUp(self):
+        cache.clear()
+        lookups.reset()
+        self.client = Client()
+        # Фильтры строятся при первом обращении.
+        for kind in lookups.KINDS:
+            lookups.get_filter(kind)
+
+    def test_missing_objects_skip_database(self):
+        """Отсутствующие профиль, группа и пост отдают 404 без запросов."""
+        urls = (
+            reverse('posts:profile', kwargs={'username': 'nobody'}),
+            reverse('posts:group_list', kwargs={'slug': 'no-slug'}),
+            reverse('posts:post_detail', kwargs={'post_id': 10 ** 6}),
+        )
+        for url in urls:
+            with self.subTest(url=url), self.assertNumQueries(0):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 404)
+
+    def test_existing_objects_are_served(self):
+        """Существующие объекты проходят через фильтр."""
+        urls = (
+            reverse('posts:profile', kwargs={'username': 'auth'}),
+            reverse('posts:group_list', kwargs={'slug': 'test-slug'}),
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk}),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_created_objects_are_visible_immediately(self):
+        """Создание объекта снимает отрицательный кеш."""
+        url = reverse('posts:profile', kwargs={'username': 'newcomer'})
+        self.assertEqual(self.client.get(url).status_code, 404)
+        User.objects.create_user(username='newcomer')
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_other_processes_see_created_objects(self):
+        """Ключ, созданный после построения фильтра, находит метка в кеше."""
+        group = Group.objects.create(
+            title='Новая', slug='new-slug', description='Описание'
+        )
+        # Фильтр процесса, построенный до создания группы.
+        lookups.reset()
+        bloom = lookups.BloomFilter(10)
+        bloom.add('test-slug')
+        lookups._filters[lookups.filter_name('group')] = (
+            float('inf'), bloom
+        )
+        self.assertTrue(lookups.may_exist('group', group.slug))
+        cache.clear()
+        self.assertFalse(lookups.may_exist('group', group.slug))
+
+    def test_false_positive_is_cached(self):
+        """Промах мимо фильтра запоминается коротким отрицательным кешем."""
+        url = reverse('posts:post_detail', kwargs={'post_id': self.post.pk})
+        Post.objects.filter(pk=self.post.pk).delete()
+        self.assertEqual(self.client.get(url).status_code, 404)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url).status_code, 404)
+
+
+@override_settings(BACKGROUND_TASKS_EAGER=True)
+class LocalCacheLookupTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='auth')
+
+    def setUp(self):
+        cache.clear()
+        lookups.reset()
+        self.addCleanup(lookups.reset)
+        lookups.get_filter('user')
+
+    def test_local_cache_falls_through_to_database(self):
+        """С кешем процесса отрицательный ответ фильтра не используется."""
+        # Как объект, созданный другим процессом: ни в фильтре, ни в кеше.
+        User.objects.bulk_create([User(username='elsewhere')])
+        self.assertFalse(lookups.may_exist('user', 'elsewhere'))
+        url = reverse('posts:profile', kwargs={'username': 'elsewhere'})
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+    @override_settings(BACKGROUND_TASKS_EAGER=False)
+    def test_filter_is_built_in_background(self):
+        """Фильтр строится фоновой задачей, запрос его не ждёт."""
+        lookups.reset()
+        with self.assertNumQueries(0):
+            self.assertIsNone(lookups.get_filter('user'))
+            self.assertIsNone(lookups.get_filter('user'))
+        self.assertEqual(
+            lookups._building, {lookups.filter_name('user')}
+        )
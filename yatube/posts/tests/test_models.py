@@ -1,7 +1,9 @@
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.db import IntegrityError, transaction
+from django.test import Client, TestCase
+from django.urls import reverse
 
-from ..models import Group, Post
+from ..models import Follow, Group, Post
 
 User = get_user_model()
 
@@ -38,3 +40,21 @@ class GroupModelTest(TestCase):
         group = GroupModelTest.group
         expected_object_name = group.title
         self.assertEqual(expected_object_name, str(group))
+
+
+class FollowModelTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(username='follower')
+        cls.author = User.objects.create(username='author')
+
+    def test_follow_is_unique(self):
+        """Повторная подписка на того же автора не создаётся."""
+        Follow.objects.create(user=self.user, author=self.author)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Follow.objects.create(user=self.user, author=self.author)
+        client = Client()
+        client.force_login(self.user)
+        client.get(reverse('posts:profile_follow', args=(self.author,)))
+        self.assertEqual(Follow.objects.count(), 1)
@@ -0,0 +1,70 @@
+from django.core.cache import cache
+from django.http import Http404
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts import objects
+from posts.models import Group, Post, User
+
+
+class ObjectCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа', slug='test-slug',
+            description='Тестовое описание'
+        )
+        Post.objects.create(author=cls.user, group=cls.group, text='Пост')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_objects_are_cached(self):
+        """Повторное чтение группы и автора обходится без запросов."""
+        for kind, value in (('group', 'test-slug'), ('user', 'auth')):
+            with self.subTest(kind=kind):
+                first = objects.get_object(kind, value)
+                with self.assertNumQueries(0):
+                    self.assertEqual(objects.get_object(kind, value), first)
+
+    def test_password_is_not_cached(self):
+        """В кеш попадает только карточка пользователя."""
+        author = objects.get_object('user', 'auth')
+        self.assertNotIn('password', author.__dict__)
+
+    def test_changes_invalidate_cache(self):
+        """Изменение и переименование сбрасывают записи кеша."""
+        objects.get_object('group', 'test-slug')
+        group = Group.objects.get(pk=self.group.pk)
+        group.title = 'Новое название'
+        group.save()
+        self.assertEqual(
+            objects.get_object('group', 'test-slug').title, 'Новое название'
+        )
+        objects.get_object('user', 'auth')
+        user = User.objects.get(pk=self.user.pk)
+        user.username = 'renamed'
+        user.save()
+        with self.assertRaises(Http404):
+            objects.get_object('user', 'auth')
+
+    def test_identity_map_loads_object_once(self):
+        """В пределах запроса объект читается из кеша один раз."""
+        objects.start_request()
+        self.addCleanup(objects.end_request)
+        first = objects.get_object('user', 'auth')
+        cache.clear()
+        with self.assertNumQueries(0):
+            self.assertIs(objects.get_object('user', 'auth'), first)
+
+    def test_cached_profile_reuses_author_for_cards(self):
+        """Профиль из тёплого кеша не читает автора из БД."""
+        url = reverse('posts:profile', kwargs={'username': 'auth'})
+        Client().get(url)
+        # Другой адрес, чтобы не сработал кеш страницы: остаются
+        # только счётчики автора и сами посты.
+        with self.assertNumQueries(2):
+            response = Client().get(url, {'page': 1})
+        post = response.context['page_obj'][0]
+        self.assertIs(post.author, response.context['author'])
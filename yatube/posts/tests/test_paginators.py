@@ -0,0 +1,83 @@
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Post
+from posts.paginators import CursorPage, CursorPaginator
+
+User = get_user_model()
+
+POSTS_COUNT = 25
+PER_PAGE = 10
+
+
+class CursorPaginatorTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='hasnoname')
+        Post.objects.bulk_create(
+            Post(author=cls.user, text=f'Тестовый пост {i}')
+            for i in range(POSTS_COUNT)
+        )
+        cls.expected = list(
+            Post.objects.order_by('-pub_date', '-id').values_list(
+                'id', flat=True
+            )
+        )
+
+    def setUp(self):
+        self.paginator = CursorPaginator(Post.objects.all(), PER_PAGE)
+
+    def walk_forward(self):
+        pages = [self.paginator.get_page(None)]
+        while pages[-1].has_next():
+            pages.append(self.paginator.get_page(pages[-1].next_cursor))
+        return pages
+
+    def test_forward_walk_returns_all_posts_in_order(self):
+        """Проход по курсорам вперёд возвращает все посты без повторов."""
+        pages = self.walk_forward()
+        ids = [post.id for page in pages for post in page]
+        self.assertEqual(ids, self.expected)
+        self.assertEqual([len(page) for page in pages], [10, 10, 5])
+        self.assertFalse(pages[0].has_previous())
+
+    def test_backward_walk_returns_previous_pages(self):
+        """Курсор «назад» возвращает предыдущую страницу."""
+        pages = self.walk_forward()
+        previous = self.paginator.get_page(pages[-1].previous_cursor)
+        self.assertEqual(
+            [post.id for post in previous],
+            [post.id for post in pages[-2]]
+        )
+        first = self.paginator.get_page(previous.previous_cursor)
+        self.assertEqual(
+            [post.id for post in first], self.expected[:PER_PAGE]
+        )
+        self.assertFalse(first.has_previous())
+        self.assertTrue(first.has_next())
+
+    def test_invalid_cursor_returns_first_page(self):
+        """Испорченный курсор открывает первую страницу."""
+        page = self.paginator.get_page('не-курсор')
+        self.assertEqual(
+            [post.id for post in page], self.expected[:PER_PAGE]
+        )
+
+    def test_cursor_page_does_not_count(self):
+        """Страница по курсору строится одним запросом без COUNT."""
+        cursor = self.paginator.get_page(None).next_cursor
+        with self.assertNumQueries(1):
+            page = self.paginator.get_page(cursor)
+        self.assertIsInstance(page, CursorPage)
+
+    def test_views_accept_cursor_parameter(self):
+        """Ленты переключаются на курсорную пагинацию по ?cursor=."""
+        response = Client().get(
+            reverse('posts:profile', kwargs={'username': self.user}),
+            {'cursor': ''}
+        )
+        page = response.context['page_obj']
+        self.assertIsInstance(page, CursorPage)
+        self.assertContains(response, f'?cursor={page.next_cursor}')
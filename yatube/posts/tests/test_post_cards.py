@@ -0,0 +1,57 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class PostCardCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='hasnoname', first_name='Иван', last_name='Иванов'
+        )
+        cls.group = Group.objects.create(
+            title='Название группы для теста',
+            slug='test-slug',
+            description='Тестовое описание группы'
+        )
+        cls.post = Post.objects.create(
+            author=cls.user,
+            text='Тестовый текст для поста',
+            group=cls.group,
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.url = reverse('posts:profile', kwargs={'username': self.user})
+
+    def test_card_is_served_from_cache(self):
+        """Карточка без изменений поста берётся из кеша."""
+        self.guest_client.get(self.url)
+        Post.objects.filter(pk=self.post.pk).update(text='Обновлённый текст')
+        response = self.guest_client.get(self.url)
+        self.assertContains(response, 'Тестовый текст для поста')
+
+    def test_card_is_invalidated_on_post_change(self):
+        """Сохранение поста сбрасывает закешированную карточку."""
+        self.guest_client.get(self.url)
+        post = Post.objects.get(pk=self.post.pk)
+        post.text = 'Обновлённый текст'
+        post.save()
+        response = self.guest_client.get(self.url)
+        self.assertContains(response, 'Обновлённый текст')
+
+    def test_card_is_invalidated_on_author_change(self):
+        """Смена имени автора сбрасывает закешированную карточку."""
+        self.guest_client.get(self.url)
+        user = User.objects.get(pk=self.user.pk)
+        user.first_name = 'Пётр'
+        user.save()
+        response = self.guest_client.get(self.url)
+        self.assertContains(response, 'Пётр Иванов')
@@ -0,0 +1,148 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Comment, Group, Post, SearchTerm
+from posts.search import Fts5Backend, InvertedIndexBackend, get_backend
+
+User = get_user_model()
+
+
+class SearchTestsMixin:
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='hasnoname')
+        cls.other = User.objects.create_user(username='other')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.rare = Post.objects.create(
+            author=cls.user,
+            text='Кошка гуляла по крыше.',
+        )
+        cls.frequent = Post.objects.create(
+            author=cls.other,
+            group=cls.group,
+            text='Кошка, кошка и ещё раз кошка.',
+        )
+        cls.commented = Post.objects.create(
+            author=cls.user,
+            text='Пост про собак.',
+        )
+        cls.comment = Comment.objects.create(
+            post=cls.commented,
+            author=cls.other,
+            text='Моя кошка их боится.',
+        )
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def search(self, **params):
+        response = self.guest_client.get(reverse('posts:search'), params)
+        return [post.id for post in response.context['page_obj']]
+
+    def test_backend(self):
+        """Настройка выбирает нужный движок поиска."""
+        self.assertIsInstance(get_backend(), self.backend)
+
+    def test_results_are_ranked(self):
+        """Частые совпадения выше, совпадения в комментариях ниже."""
+        self.assertEqual(
+            self.search(q='КОШКА'),
+            [self.frequent.id, self.rare.id, self.commented.id]
+        )
+
+    def test_all_terms_must_match(self):
+        """Находятся только посты, содержащие все слова запроса."""
+        self.assertEqual(self.search(q='кошка крыше'), [self.rare.id])
+        self.assertEqual(self.search(q='кошка слон'), [])
+
+    def test_terms_must_match_in_one_document(self):
+        """Слова из поста и из комментария к нему вместе не находятся."""
+        self.assertEqual(self.search(q='собак кошка'), [])
+        self.assertEqual(self.search(q='кошка боится'), [self.commented.id])
+
+    def test_filters(self):
+        """Результаты фильтруются по группе и автору."""
+        self.assertEqual(
+            self.search(q='кошка', group=self.group.slug),
+            [self.frequent.id]
+        )
+        self.assertEqual(
+            self.search(q='кошка', author=self.user.username),
+            [self.rare.id, self.commented.id]
+        )
+
+    def test_index_follows_changes(self):
+        """Индекс обновляется при правке и удалении постов и комментариев."""
+        post = Post.objects.get(pk=self.rare.pk)
+        post.text = 'Слон гулял по крыше.'
+        post.save()
+        Comment.objects.get(pk=self.comment.pk).delete()
+        Post.objects.get(pk=self.frequent.pk).delete()
+        self.assertEqual(self.search(q='кошка'), [])
+        self.assertEqual(self.search(q='слон'), [self.rare.id])
+        Comment.objects.create(
+            post=self.commented,
+            author=self.user,
+            text='Слон там тоже был вчера.'
+        )
+        self.assertEqual(
+            self.search(q='слон'), [self.rare.id, self.commented.id]
+        )
+
+    def test_rebuild_command(self):
+        """Команда rebuild_search_index восстанавливает индекс."""
+        SearchTerm.objects.all().delete()
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM posts_search')
+            cursor.execute('DELETE FROM posts_comment_search')
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(
+            self.search(q='кошка'),
+            [self.frequent.id, self.rare.id, self.commented.id]
+        )
+
+    @override_settings(COUNT_POST=1)
+    def test_pagination_keeps_query(self):
+        """Ссылки пагинатора сохраняют параметры поиска."""
+        response = self.guest_client.get(
+            reverse('posts:search'), {'q': 'кошка'}
+        )
+        self.assertEqual(response.context['page_obj'].paginator.count, 3)
+        self.assertContains(
+            response, '?q=%D0%BA%D0%BE%D1%88%D0%BA%D0%B0&amp;page=2'
+        )
+
+    def test_admin_search_uses_index(self):
+        """Поиск в админке находит посты через индекс."""
+        admin = User.objects.create_superuser(
+            'admin', 'admin@example.com', 'password'
+        )
+        client = Client()
+        client.force_login(admin)
+        response = client.get(
+            reverse('admin:posts_post_changelist'), {'q': 'крыше'}
+        )
+        self.assertEqual(
+            [post.id for post in response.context['cl'].result_list],
+            [self.rare.id]
+        )
+
+
+@override_settings(POST_SEARCH_BACKEND='python')
+class InvertedIndexSearchTests(SearchTestsMixin, TestCase):
+    backend = InvertedIndexBackend
+
+
+@override_settings(POST_SEARCH_BACKEND='auto')
+class Fts5SearchTests(SearchTestsMixin, TestCase):
+    backend = Fts5Backend
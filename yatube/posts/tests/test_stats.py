@@ -0,0 +1,80 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Post, UserStats
+
+User = get_user_model()
+
+
+class UserStatsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+
+    def setUp(self):
+        cache.clear()
+
+    def stats(self, user):
+        return UserStats.objects.get(user=user)
+
+    def test_counters_follow_changes(self):
+        """Сигналы меняют счётчики при создании и удалении объектов."""
+        post = Post.objects.create(author=self.author, text='Пост')
+        comment = Comment.objects.create(
+            post=post, author=self.reader, text='Комментарий'
+        )
+        follow = Follow.objects.create(user=self.reader, author=self.author)
+        author, reader = self.stats(self.author), self.stats(self.reader)
+        self.assertEqual(author.posts_count, 1)
+        self.assertEqual(author.followers_count, 1)
+        self.assertEqual(reader.following_count, 1)
+        self.assertEqual(reader.comments_count, 1)
+        comment.delete()
+        follow.delete()
+        post.delete()
+        author, reader = self.stats(self.author), self.stats(self.reader)
+        self.assertEqual(
+            (author.posts_count, author.followers_count), (0, 0)
+        )
+        self.assertEqual(
+            (reader.following_count, reader.comments_count), (0, 0)
+        )
+
+    def test_recount_repairs_drift(self):
+        """recount_user_stats восстанавливает разошедшиеся счётчики."""
+        Post.objects.create(author=self.author, text='Пост')
+        Follow.objects.create(user=self.reader, author=self.author)
+        UserStats.objects.update(posts_count=7, followers_count=0)
+        UserStats.objects.filter(user=self.reader).delete()
+        call_command('recount_user_stats', stdout=StringIO())
+        self.assertEqual(self.stats(self.author).posts_count, 1)
+        self.assertEqual(self.stats(self.author).followers_count, 1)
+        self.assertEqual(self.stats(self.reader).following_count, 1)
+
+    def test_profile_shows_follow_counts(self):
+        """Профиль выводит счётчики, кеш страницы сбрасывается подпиской."""
+        url = reverse('posts:profile', kwargs={'username': self.author})
+        guest_client = Client()
+        self.assertContains(guest_client.get(url), 'Подписчиков: 0')
+        Follow.objects.create(user=self.reader, author=self.author)
+        self.assertContains(guest_client.get(url), 'Подписчиков: 1')
+
+    def test_follower_profile_shows_new_following(self):
+        """Подписка сбрасывает кеш и ETag профиля самого подписчика."""
+        url = reverse('posts:profile', kwargs={'username': self.reader})
+        guest_client = Client()
+        response = guest_client.get(url)
+        self.assertContains(response, 'подписок: 0')
+        Follow.objects.create(user=self.reader, author=self.author)
+        response = guest_client.get(
+            url, HTTP_IF_NONE_MATCH=response['ETag']
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'подписок: 1')
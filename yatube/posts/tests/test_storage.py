@@ -0,0 +1,154 @@
+import os
+import shutil
+import tempfile
+import threading
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from posts.images import rendition_names, sweep_images
+from posts.models import Post
+from posts.storage import ContentAddressedStorage
+from posts.uploadhandlers import MediaTemporaryUploadedFile
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+def tearDownModule():
+    shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+
+def make_old(path):
+    os.utime(path, (0, 0))
+
+
+class ContentAddressedStorageTests(TestCase):
+    def setUp(self):
+        self.storage = ContentAddressedStorage(location=TEMP_MEDIA_ROOT)
+
+    def test_same_content_is_stored_once(self):
+        """Одинаковое содержимое сохраняется в один файл."""
+        first = self.storage.save('posts/a.gif', ContentFile(SMALL_GIF))
+        second = self.storage.save('posts/b.GIF', ContentFile(SMALL_GIF))
+        self.assertEqual(first, second)
+        self.assertTrue(self.storage.is_blob(first))
+        self.assertTrue(first.startswith('posts/') and first.endswith('.gif'))
+        self.assertEqual(len(os.listdir(os.path.dirname(
+            self.storage.path(first)
+        ))), 1)
+
+    @override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+    def test_temporary_upload_is_linked_without_copy(self):
+        """Загрузка из временного файла ставится на место ссылкой."""
+        os.makedirs(os.path.join(TEMP_MEDIA_ROOT, 'tmp'), exist_ok=True)
+        upload = MediaTemporaryUploadedFile(
+            'a.gif', 'image/gif', len(SMALL_GIF), None
+        )
+        upload.write(SMALL_GIF + b'linked')
+        upload.flush()
+        upload.seek(0)
+        name = self.storage.save('posts/a.gif', upload)
+        self.assertTrue(os.path.samefile(
+            upload.temporary_file_path(), self.storage.path(name)
+        ))
+        upload.close()
+        with open(self.storage.path(name), 'rb') as file:
+            self.assertEqual(file.read(), SMALL_GIF + b'linked')
+
+    def test_different_content_gets_different_names(self):
+        """Разное содержимое сохраняется в разные файлы."""
+        first = self.storage.save('posts/a.gif', ContentFile(SMALL_GIF))
+        second = self.storage.save('posts/a.gif', ContentFile(b'other'))
+        self.assertNotEqual(first, second)
+
+    def test_concurrent_saves_write_one_file(self):
+        """Параллельные загрузки одного файла не плодят копий с суффиксами."""
+        content = SMALL_GIF + b'concurrent'
+        names = []
+        workers = [
+            threading.Thread(target=lambda: names.append(self.storage.save(
+                'posts/a.gif', ContentFile(content)
+            )))
+            for _ in range(8)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        self.assertEqual(len(set(names)), 1)
+        self.assertEqual(os.listdir(os.path.dirname(
+            self.storage.path(names[0])
+        )), [os.path.basename(names[0])])
+
+    def test_reused_file_is_touched(self):
+        """Повторное сохранение обновляет mtime, а не переписывает файл."""
+        name = self.storage.save('posts/a.gif', ContentFile(SMALL_GIF))
+        path = self.storage.path(name)
+        make_old(path)
+        self.storage.save('posts/b.gif', ContentFile(SMALL_GIF))
+        self.assertGreater(os.stat(path).st_mtime, 0)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ImageSweepTests(TransactionTestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='hasnoname')
+        self.first = Post.objects.create(author=self.user, text='Первый')
+        self.second = Post.objects.create(author=self.user, text='Второй')
+        for post in (self.first, self.second):
+            post.image.save('small.gif', ContentFile(SMALL_GIF))
+        self.path = self.first.image.path
+
+    def test_shared_image_is_kept_while_referenced(self):
+        """Файл удаляется только после последнего поста."""
+        self.assertEqual(self.first.image.name, self.second.image.name)
+        make_old(self.path)
+        self.first.delete()
+        self.assertEqual(sweep_images(), 0)
+        self.assertTrue(os.path.exists(self.path))
+        self.second.delete()
+        self.assertEqual(sweep_images(), 1)
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_replaced_image_is_swept_with_renditions(self):
+        """Заменённая во всех постах картинка удаляется вместе с нарезками."""
+        rendition = next(rendition_names(self.first.image.name))
+        default_storage.save(rendition, ContentFile(b'rendition'))
+        for post in (self.first, self.second):
+            post.image.save('other.gif', ContentFile(SMALL_GIF + b'\x00'))
+        self.assertTrue(os.path.exists(self.path))
+        make_old(self.path)
+        make_old(default_storage.path(rendition))
+        call_command('sweep_images', stdout=StringIO())
+        self.assertFalse(os.path.exists(self.path))
+        self.assertFalse(default_storage.exists(rendition))
+        self.assertTrue(os.path.exists(self.first.image.path))
+
+    def test_recently_used_image_is_kept(self):
+        """Файл, который только что переиспользовали, не удаляется."""
+        Post.objects.all().delete()
+        self.assertEqual(sweep_images(), 0)
+        self.assertTrue(os.path.exists(self.path))
+
+    def test_interrupted_sweep_is_rolled_back(self):
+        """Файл, оставшийся в карантине после сбоя, возвращается на место."""
+        os.rename(self.path, f'{self.path}.sweep')
+        sweep_images()
+        self.assertTrue(os.path.exists(self.path))
+        self.assertFalse(os.path.exists(f'{self.path}.sweep'))
@@ -0,0 +1,155 @@
+import shutil
+import tempfile
+from io import BytesIO
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from posts.models import Post
+from posts import thumbnails
+from posts.thumbnails import generate_renditions
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+def make_image(name='image.png', size=(50, 50), image_format='png',
+               exif=None):
+    file_obj = BytesIO()
+    options = {'exif': exif} if exif else {}
+    Image.new('RGB', size, color=(255, 0, 0)).save(
+        file_obj, image_format, **options
+    )
+    return SimpleUploadedFile(
+        name, file_obj.getvalue(), content_type=f'image/{image_format}'
+    )
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, BACKGROUND_TASKS_EAGER=True)
+class PostThumbnailTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='hasnoname')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_thumbnail_is_generated_on_create(self):
+        """При создании поста миниатюра строится и сохраняется в посте."""
+        self.authorized_client.post(reverse('posts:post_create'), data={
+            'text': 'Пост с картинкой',
+            'image': make_image(),
+        })
+        post = Post.objects.get(text='Пост с картинкой')
+        self.assertTrue(post.thumbnail)
+        response = self.authorized_client.get(
+            reverse('posts:post_detail', kwargs={'post_id': post.id})
+        )
+        self.assertContains(response, f'src="{post.thumbnail}"')
+        self.assertContains(response, 'srcset=')
+
+    def test_renditions_cover_all_sizes(self):
+        """Для каждой ширины строится нарезка в формате JPEG."""
+        self.authorized_client.post(reverse('posts:post_create'), data={
+            'text': 'Пост с картинкой',
+            'image': make_image(),
+        })
+        post = Post.objects.get(text='Пост с картинкой')
+        srcset = post.image_srcsets['jpeg']
+        for width, _ in settings.POST_IMAGE_SIZES:
+            with self.subTest(width=width):
+                self.assertIn(f' {width}w', srcset)
+
+    @override_settings(POST_IMAGE_MAX_SIDE=100)
+    def test_original_is_capped_and_stripped(self):
+        """Большой оригинал уменьшается, EXIF из него удаляется."""
+        exif = Image.Exif()
+        exif[0x010F] = 'Camera'
+        self.authorized_client.post(reverse('posts:post_create'), data={
+            'text': 'Пост с картинкой',
+            'image': make_image('photo.jpg', (400, 200), 'jpeg', exif),
+        })
+        post = Post.objects.get(text='Пост с картинкой')
+        with Image.open(post.image.path) as image:
+            self.assertEqual(image.size, (100, 50))
+            self.assertFalse(image.getexif())
+
+    def test_thumbnail_is_regenerated_on_image_change(self):
+        """Замена картинки при редактировании строит новую миниатюру."""
+        post = Post.objects.create(
+            author=self.user, text='Пост с картинкой', image=make_image()
+        )
+        post.thumbnail = '/media/old.jpg'
+        post.save()
+        self.authorized_client.post(
+            reverse('posts:post_edit', kwargs={'post_id': post.id}),
+            data={'text': 'Новый текст', 'image': make_image('new.png')}
+        )
+        post.refresh_from_db()
+        self.assertNotEqual(post.thumbnail, '/media/old.jpg')
+        self.assertTrue(post.thumbnail)
+
+    def test_post_without_thumbnail_shows_original(self):
+        """Пока миниатюры нет, карточка показывает исходную картинку."""
+        post = Post.objects.create(
+            author=self.user, text='Пост с картинкой', image=make_image()
+        )
+        response = self.authorized_client.get(
+            reverse('posts:post_detail', kwargs={'post_id': post.id})
+        )
+        self.assertContains(response, f'src="{post.image.url}"')
+
+    @override_settings(POST_THUMBNAIL_WIDTH=700)
+    def test_thumbnail_falls_back_to_nearest_width(self):
+        """Без нарезки нужной ширины миниатюрой становится ближайшая."""
+        post = Post.objects.create(
+            author=self.user, text='Пост с картинкой', image=make_image()
+        )
+        generate_renditions(post.id)
+        post.refresh_from_db()
+        self.assertTrue(post.thumbnail.endswith('_480.jpg'))
+
+    @override_settings(POST_IMAGE_FORMATS=())
+    def test_no_renditions_leave_original(self):
+        """Без нарезок миниатюра пуста, и карточка показывает оригинал."""
+        post = Post.objects.create(
+            author=self.user, text='Пост с картинкой', image=make_image()
+        )
+        generate_renditions(post.id)
+        post.refresh_from_db()
+        self.assertEqual(post.thumbnail, '')
+
+    def test_outdated_renditions_are_not_saved(self):
+        """Нарезки заменённой во время работы картинки не сохраняются."""
+        post = Post.objects.create(
+            author=self.user, text='Пост с картинкой', image=make_image()
+        )
+
+        def replace_image(image):
+            renditions = build_renditions(image)
+            Post.objects.filter(pk=post.pk).update(image='posts/new.png')
+            return renditions
+
+        build_renditions = thumbnails.build_renditions
+        with mock.patch.object(
+            thumbnails, 'build_renditions', side_effect=replace_image
+        ):
+            generate_renditions(post.id)
+        post.refresh_from_db()
+        self.assertEqual(post.thumbnail, '')
+        self.assertEqual(post.image.name, 'posts/new.png')
@@ -0,0 +1,124 @@
+import hashlib
+import os
+import shutil
+import tempfile
+from io import BytesIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.files.uploadhandler import SkipFile
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from posts.models import Post
+from posts.uploadhandlers import BoundedUploadHandler, upload_temp_dir
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+def make_image(size=(50, 50)):
+    file_obj = BytesIO()
+    Image.new('RGB', size, color=(255, 0, 0)).save(file_obj, 'png')
+    return file_obj.getvalue()
+
+
+def make_camera_jpeg(size=(3000, 3000)):
+    """JPEG как с камеры: с EXIF-ориентацией."""
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    file_obj = BytesIO()
+    Image.new('RGB', size, color=(200, 10, 10)).save(
+        file_obj, 'jpeg', exif=exif.tobytes()
+    )
+    return file_obj.getvalue()
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class BoundedUploadTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='hasnoname')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def post_image(self, content, name='image.png'):
+        return self.authorized_client.post(reverse('posts:post_create'), {
+            'text': 'Пост с картинкой',
+            'image': SimpleUploadedFile(name, content),
+        })
+
+    def test_handler_hashes_and_writes_stream(self):
+        """Обработчик пишет поток в файл и считает sha256."""
+        content = make_image()
+        handler = BoundedUploadHandler()
+        handler.new_file('image', 'image.png', 'image/png', len(content))
+        for start in range(0, len(content), 64):
+            handler.receive_data_chunk(content[start:start + 64], start)
+        uploaded = handler.file_complete(len(content))
+        self.assertEqual(uploaded.read(), content)
+        self.assertEqual(
+            uploaded.content_hash, hashlib.sha256(content).hexdigest()
+        )
+        self.assertEqual(
+            upload_temp_dir(), os.path.join(TEMP_MEDIA_ROOT, 'tmp')
+        )
+        self.assertTrue(
+            uploaded.temporary_file_path().startswith(upload_temp_dir())
+        )
+        uploaded.close()
+
+    @override_settings(POST_IMAGE_MAX_UPLOAD_SIZE=100)
+    def test_handler_skips_file_over_limit(self):
+        """Превысивший лимит файл отбрасывается, а не дочитывается."""
+        content = make_image()
+        handler = BoundedUploadHandler()
+        handler.new_file('image', 'image.png', 'image/png', len(content))
+        handler.receive_data_chunk(content[:64], 0)
+        with self.assertRaises(SkipFile):
+            handler.receive_data_chunk(content[64:128], 64)
+        handler.file.close()
+
+    def test_upload_is_saved(self):
+        """Картинка в пределах лимитов сохраняется в пост."""
+        self.post_image(make_image())
+        self.assertTrue(Post.objects.get(text='Пост с картинкой').image)
+
+    @override_settings(POST_IMAGE_MAX_UPLOAD_SIZE=100)
+    def test_too_large_upload_is_rejected(self):
+        """Файл больше лимита отклоняется с понятной ошибкой."""
+        response = self.post_image(make_image())
+        self.assertFormError(response, 'form', 'image', 'Файл больше 0 МБ.')
+        self.assertFalse(Post.objects.exists())
+
+    def test_too_large_camera_jpeg_is_rejected(self):
+        """Обрезанный по лимиту JPEG с EXIF даёт ошибку формы, а не 500."""
+        content = make_camera_jpeg()
+        with self.settings(POST_IMAGE_MAX_UPLOAD_SIZE=len(content) // 2):
+            response = self.post_image(content, 'photo.jpg')
+        self.assertEqual(response.status_code, 200)
+        self.assertFormError(response, 'form', 'image', 'Файл больше 0 МБ.')
+        self.assertEqual(response.context['form']['text'].value(), (
+            'Пост с картинкой'
+        ))
+        self.assertFalse(Post.objects.exists())
+
+    @override_settings(POST_IMAGE_MAX_PIXELS=100)
+    def test_too_many_pixels_are_rejected(self):
+        """Картинка с разрешением больше лимита отклоняется."""
+        response = self.post_image(make_image())
+        self.assertFormError(
+            response, 'form', 'image',
+            'Слишком большое разрешение картинки: 50x50.'
+        )
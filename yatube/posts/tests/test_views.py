@@ -1,18 +1,31 @@
+import shutil
+import tempfile
 from http import HTTPStatus
 
 from django import forms
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.cache import cache
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import Client, TestCase
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
-from posts.models import Follow, Group, Post
+from posts.models import Comment, Follow, Group, Post
 
 User = get_user_model()
 
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
 
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
 class PostViewsTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
     @classmethod
     def setUpClass(cls):
         super().setUpClass()
@@ -98,6 +111,28 @@ class PostViewsTests(TestCase):
             response.context['post'].text, 'Тестовый текст для поста'
         )
 
+    def test_post_detail_queries_do_not_depend_on_comments(self):
+        """Число запросов post_detail не растёт с числом комментариев."""
+        url = reverse('posts:post_detail', kwargs={'post_id': self.post.id})
+
+        def count_queries():
+            with CaptureQueriesContext(connection) as queries:
+                self.guest_client.get(url)
+            return len(queries)
+
+        Comment.objects.create(
+            post=self.post, author=self.user, text='Комментарий'
+        )
+        count_queries()
+        one_comment_queries = count_queries()
+        Comment.objects.bulk_create(
+            Comment(post=self.post, author=author, text='Комментарий')
+            for author in (self.new_user, self.user_author, self.user)
+        )
+        self.assertEqual(count_queries(), one_comment_queries)
+        # ETag, пост с автором и группой, страница комментариев.
+        self.assertLessEqual(one_comment_queries, 3)
+
     def test_post_create_page_show_correct_context(self):
         """Шаблон post_create сформирован с правильным контекстом."""
         response = self.authorized_client.get(reverse('posts:post_create'))
@@ -141,13 +176,14 @@ class PostViewsTests(TestCase):
         def response():
             return self.guest_client.get(reverse('posts:index'))
 
-        response_primary = response().content
+        response_primary = response()
+        response_secondary = response()
+        self.assertTemplateUsed(response_primary, 'posts/index.html')
+        self.assertTemplateNotUsed(response_secondary, 'posts/index.html')
+        self.assertEqual(response_primary.content, response_secondary.content)
         post_del_cache.delete()
-        response_secondary = response().content
-        self.assertEqual(response_primary, response_secondary)
-        cache.clear()
-        response_cache_clear = response().content
-        self.assertNotEqual(response_secondary, response_cache_clear)
+        response_after_delete = response().content
+        self.assertNotEqual(response_secondary.content, response_after_delete)
 
     def test_authorized_client_follow(self):
         """
@@ -0,0 +1,50 @@
+import json
+
+from django.conf import settings
+from django.db import transaction
+
+from core.tasks import run_in_background
+
+from .images import build_renditions
+from .models import Post
+
+
+def pick_thumbnail(renditions):
+    """
+    URL миниатюры: JPEG шириной POST_THUMBNAIL_WIDTH.
+
+    Если такой нарезки нет (ширины нет в POST_IMAGE_SIZES или JPEG
+    выключен), берётся ближайшая по ширине, JPEG — в первую очередь.
+    """
+    if not renditions:
+        return ''
+    return min(renditions, key=lambda rendition: (
+        rendition['format'] != 'jpeg',
+        abs(rendition['width'] - settings.POST_THUMBNAIL_WIDTH)
+    ))['url']
+
+
+def generate_renditions(post_id):
+    """Нарезать картинку поста и сохранить URL нарезок в посте."""
+    post = Post.objects.select_related('author').filter(pk=post_id).first()
+    if post is None or not post.image:
+        return
+    image_name = post.image.name
+    renditions = build_renditions(post.image)
+    post.renditions = json.dumps(renditions)
+    post.thumbnail = pick_thumbnail(renditions)
+    with transaction.atomic():
+        # Картинку могли заменить, пока шла нарезка: тогда нарезки
+        # сохранит задача новой картинки, а эти устарели.
+        current = Post.objects.select_for_update().filter(
+            pk=post_id
+        ).values_list('image', flat=True).first()
+        if current != image_name:
+            return
+        # save, а не update: сигналы сбросят кеш карточки и лент.
+        post.save(update_fields=('thumbnail', 'renditions'))
+
+
+def schedule_thumbnail(post):
+    if post.image:
+        run_in_background(generate_renditions, post.id)
@@ -0,0 +1,79 @@
+import hashlib
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.files.uploadedfile import (
+    TemporaryUploadedFile, UploadedFile
+)
+from django.core.files.uploadhandler import FileUploadHandler, SkipFile
+
+
+def upload_temp_dir():
+    """Каталог временных файлов загрузок внутри текущего MEDIA_ROOT."""
+    return settings.FILE_UPLOAD_TEMP_DIR or os.path.join(
+        settings.MEDIA_ROOT, 'tmp'
+    )
+
+
+def rejected_uploads(request):
+    """Имена полей, файлы которых отброшены как слишком большие."""
+    return getattr(request, 'rejected_uploads', set())
+
+
+class MediaTemporaryUploadedFile(TemporaryUploadedFile):
+    """TemporaryUploadedFile в upload_temp_dir(), а не в настройке."""
+
+    def __init__(self, name, content_type, size, charset,
+                 content_type_extra=None):
+        _, ext = os.path.splitext(name)
+        file = tempfile.NamedTemporaryFile(
+            suffix='.upload' + ext, dir=upload_temp_dir()
+        )
+        UploadedFile.__init__(
+            self, file, name, content_type, size, charset,
+            content_type_extra
+        )
+
+
+class BoundedUploadHandler(FileUploadHandler):
+    """
+    Потоковая запись загрузки во временный файл внутри MEDIA_ROOT.
+
+    Файл пишется кусками сразу на диск и одновременно хешируется
+    (sha256 в атрибуте content_hash). Как только файл превышает
+    POST_IMAGE_MAX_UPLOAD_SIZE, он отбрасывается целиком (SkipFile):
+    остаток не пишется и не хешируется, а имя поля попадает
+    в request.rejected_uploads. Временный файл лежит на той же файловой
+    системе, что и MEDIA_ROOT, поэтому хранилище переносит его
+    без копирования.
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        os.makedirs(upload_temp_dir(), exist_ok=True)
+        self.file = MediaTemporaryUploadedFile(
+            self.file_name, self.content_type, 0, self.charset,
+            self.content_type_extra
+        )
+        self.hash = hashlib.sha256()
+        self.written = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        if self.written + len(raw_data) > settings.POST_IMAGE_MAX_UPLOAD_SIZE:
+            if self.request is not None:
+                self.request.rejected_uploads = (
+                    rejected_uploads(self.request) | {self.field_name}
+                )
+            # Парсер закроет (и удалит) временный файл и перейдёт
+            # к следующим полям формы.
+            raise SkipFile
+        self.hash.update(raw_data)
+        self.file.write(raw_data)
+        self.written += len(raw_data)
+
+    def file_complete(self, file_size):
+        self.file.seek(0)
+        self.file.size = self.written
+        self.file.content_hash = self.hash.hexdigest()
+        return self.file
@@ -6,6 +6,7 @@ app_name = 'posts'
 
 urlpatterns = [
     path('', views.index, name='index'),
+    path('search/', views.search, name='search'),
     path('create/', views.post_create, name='post_create'),
     path('group/<slug:slug>/', views.group_list, name='group_list'),
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
@@ -13,6 +14,8 @@ urlpatterns = [
     path('profile/<str:username>/', views.profile, name='profile'),
     path('posts/<int:post_id>/comment/', views.add_comment,
          name='add_comment'),
+    path('posts/<int:post_id>/comments/', views.post_comments,
+         name='comments'),
     path('follow/', views.follow_index, name='follow_index'),
     path('profile/<str:username>/follow/', views.profile_follow,
          name='profile_follow'),
@@ -0,0 +1,40 @@
+import time
+
+from django.core.cache import cache
+
+from core.cache import shared_timeout
+
+
+def version_key(name):
+    return f'version:{name}'
+
+
+def initial_version():
+    # Начинаем с текущего времени, чтобы после вытеснения ключа из кеша
+    # версия не совпала ни с одной из уже выданных.
+    return int(time.time() * 1000)
+
+
+def get_versions(*names):
+    """
+    Текущие версии сущностей вида 'post:1', 'user:2', 'group:3'.
+
+    В общем кеше версии бессрочны, в LocMem истекают через
+    LOCAL_CACHE_TIMEOUT: увеличить их из другого процесса нельзя.
+    """
+    keys = [version_key(name) for name in names]
+    versions = cache.get_many(keys)
+    missing = {key: initial_version() for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, shared_timeout(None))
+        versions.update(missing)
+    return [versions[key] for key in keys]
+
+
+def bump(*names):
+    for name in names:
+        key = version_key(name)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, initial_version(), shared_timeout(None))
@@ -1,76 +1,186 @@
+from functools import partial
+
 from django.conf import settings
 from django.contrib.auth.decorators import login_required
 from django.core.paginator import Paginator
+from django.http import JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
-from django.views.decorators.cache import cache_page
+from django.urls import reverse
+from django.views.decorators.http import condition
+
+from .counters import CountedPaginator, post_count
+from .etags import group_etag, post_detail_etag, profile_etag
+from .feed_cache import cache_feed
+from .feed_ids import FeedIds
+from .feeds import follow_feed
+from .forms import CommentForm, PostForm, SearchForm
+from .lookups import require_existing
+from .models import Comment, Follow, Post
+from .objects import get_object
+from .paginators import CursorPaginator
+from .search import SearchResults
+from .services import save_post
+from .stats import get_stats
+from .uploadhandlers import rejected_uploads
 
-from .forms import CommentForm, PostForm
-from .models import Follow, Group, Post, User
 
+def paginate_queryset(queryset, request, count=None, feed=None):
+    """
+    Страница ленты: по ?cursor= — keyset, иначе по номеру.
 
-def paginate_queryset(queryset, request):
-    paginator = Paginator(queryset, settings.COUNT_POST)
+    feed — фабрика FeedIds для queryset: страницы по номеру тогда
+    собираются из закешированного списка id.
+    """
+    cursor = request.GET.get('cursor')
+    if cursor is not None or settings.FEED_PAGINATION == 'cursor':
+        paginator = CursorPaginator(queryset, settings.COUNT_POST)
+        return paginator.get_page(cursor)
+    if feed is not None:
+        queryset = feed(queryset, count=count)
+        count = None
+    elif callable(count):
+        count = count()
+    paginator = CountedPaginator(queryset, settings.COUNT_POST, count=count)
     page_number = request.GET.get('page')
     return paginator.get_page(page_number)
 
 
-@cache_page(20)
+def paginate_comments(post_id, request):
+    comments = Comment.objects.filter(post_id=post_id).select_related(
+        'author'
+    )
+    paginator = CursorPaginator(
+        comments, settings.COUNT_COMMENT, ordering=('created', 'id')
+    )
+    return paginator.get_page(request.GET.get('cursor'))
+
+
+@cache_feed('index')
 def index(request):
     posts = Post.objects.select_related('group', 'author')
     context = {
-        'page_obj': paginate_queryset(posts, request)
+        'page_obj': paginate_queryset(
+            posts, request, post_count, feed=FeedIds.index
+        )
     }
     return render(request, 'posts/index.html', context)
 
 
+@require_existing('group', 'slug')
+@condition(etag_func=group_etag)
+@cache_feed('group', 'slug')
 def group_list(request, slug):
-    group = get_object_or_404(Group, slug=slug)
+    group = get_object('group', slug)
     posts = group.posts.select_related('author')
     context = {
         'group': group,
-        'page_obj': paginate_queryset(posts, request)
+        'page_obj': paginate_queryset(
+            posts, request, partial(post_count, group_id=group.id),
+            feed=partial(FeedIds.group, group_id=group.id)
+        )
     }
     return render(request, 'posts/group_list.html', context)
 
 
+@require_existing('user', 'username')
+@condition(etag_func=profile_etag)
+@cache_feed('profile', 'username')
 def profile(request, username):
-    author = get_object_or_404(User, username=username)
-    posts = Post.objects.filter(author=author)
-    posts_count = posts.count()
-    following = request.user.is_authenticated and Follow.objects.filter(
-        author=author, user=request.user
-    ).exists()
+    author = get_object('user', username)
+    # Автор карточек берётся из author: менеджер связи проставляет его сам.
+    posts = author.posts.select_related('group')
+    stats = get_stats(author)
+    posts_count = stats.posts_count
     context = {
         'author': author,
-        'page_obj': paginate_queryset(posts, request),
+        'page_obj': paginate_queryset(
+            posts, request, posts_count,
+            feed=partial(FeedIds.author, author_id=author.id)
+        ),
         'posts_count': posts_count,
-        'following': following
+        'stats': stats
     }
     return render(request, 'posts/profile.html', context)
 
 
+def search(request):
+    form = SearchForm(request.GET or None)
+    page_obj = None
+    if form.is_valid():
+        posts = Post.objects.all()
+        if form.cleaned_data['group']:
+            posts = posts.filter(group=form.cleaned_data['group'])
+        if form.cleaned_data['author']:
+            posts = posts.filter(
+                author__username=form.cleaned_data['author']
+            )
+        results = SearchResults(form.cleaned_data['q'], posts)
+        paginator = Paginator(results, settings.COUNT_POST)
+        page_obj = paginator.get_page(request.GET.get('page'))
+    page_query = request.GET.copy()
+    page_query.pop('page', None)
+    context = {
+        'form': form,
+        'page_obj': page_obj,
+        'page_query': page_query.urlencode() + '&' if page_query else ''
+    }
+    return render(request, 'posts/search.html', context)
+
+
+@require_existing('post', 'post_id')
+@condition(etag_func=post_detail_etag)
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
+    post = get_object_or_404(
+        Post.objects.select_related('author__stats', 'group'), pk=post_id
+    )
     comment_form = CommentForm(request.POST or None)
-    comment_post = post.comments.all()
     context = {
         'post': post,
         'form': comment_form,
-        'comments': comment_post
+        'comments': paginate_comments(post.id, request),
+        'posts_count': get_stats(post.author).posts_count
     }
     return render(request, 'posts/post_detail.html', context)
 
 
+def post_comments(request, post_id):
+    post = get_object_or_404(Post.objects.only('id'), pk=post_id)
+    comments = paginate_comments(post.id, request)
+    if request.GET.get('format') == 'json':
+        next_url = None
+        if comments.has_next():
+            next_url = '{}?format=json&cursor={}'.format(
+                reverse('posts:comments', args=(post.id,)),
+                comments.next_cursor
+            )
+        return JsonResponse({
+            'comments': [
+                {
+                    'id': comment.id,
+                    'author': comment.author.username,
+                    'text': comment.text,
+                    'created': comment.created.isoformat(),
+                }
+                for comment in comments
+            ],
+            'next': next_url,
+        })
+    context = {
+        'post': post,
+        'comments': comments
+    }
+    return render(request, 'posts/includes/comments.html', context)
+
+
 @login_required
 def post_create(request):
     form = PostForm(
         request.POST or None,
-        files=request.FILES or None
+        files=request.FILES or None,
+        too_large=rejected_uploads(request)
     )
     if form.is_valid():
-        post = form.save(commit=False)
-        post.author = request.user
-        post.save()
+        post = save_post(form, author=request.user)
         return redirect('posts:profile', post.author.username)
     context = {
         'title': 'Добавить запись',
@@ -88,11 +198,11 @@ def post_edit(request, post_id):
     form = PostForm(
         request.POST or None,
         files=request.FILES or None,
-        instance=post
+        instance=post,
+        too_large=rejected_uploads(request)
     )
     if form.is_valid():
-        post = form.save(commit=False)
-        post.save()
+        save_post(form)
         return redirect('posts:post_detail', post_id=post_id)
     context = {
         'post': post,
@@ -116,19 +226,23 @@ def add_comment(request, post_id):
 
 @login_required
 def follow_index(request):
-    posts = Post.objects.select_related('author', 'group').filter(
-        author__following__user=request.user
-    )
+    if settings.FOLLOW_FEED_MATERIALIZED:
+        posts = follow_feed(request.user)
+        feed = None
+    else:
+        posts = Post.objects.filter(author__following__user=request.user)
+        feed = partial(FeedIds.follow, user_id=request.user.id)
+    posts = posts.select_related('author', 'group')
     context = {
         'title': 'Все посты ваших подписок',
-        'page_obj': paginate_queryset(posts, request)
+        'page_obj': paginate_queryset(posts, request, feed=feed)
     }
     return render(request, 'posts/follow.html', context)
 
 
 @login_required
 def profile_follow(request, username):
-    author = get_object_or_404(User, username=username)
+    author = get_object('user', username, fresh=True)
     if author != request.user:
         Follow.objects.get_or_create(
             author=author,
@@ -141,6 +255,6 @@ def profile_follow(request, username):
 def profile_unfollow(request, username):
     Follow.objects.filter(
         user=request.user,
-        author__username=username
+        author=get_object('user', username, fresh=True)
     ).delete()
     return redirect('posts:profile', username)
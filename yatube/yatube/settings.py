@@ -2,6 +2,68 @@ import os
 
 COUNT_POST = 10
 
+COUNT_COMMENT = 20
+
+# Сколько объектов можно запросить в API одним ?ids=.
+API_MAX_IDS = 100
+
+# 'page' — номера страниц, 'cursor' — keyset-пагинация по ?cursor=
+FEED_PAGINATION = 'page'
+
+POST_COUNT_CACHE_TIMEOUT = 60 * 60
+
+# Дальше этого числа строк отфильтрованные списки админки не считаются.
+ESTIMATED_COUNT_LIMIT = 10000
+
+GROUP_CHOICES_CACHE_TIMEOUT = 60 * 60 * 24
+
+FEED_CACHE_TIMEOUT = 60 * 60 * 24
+# С LocMem у каждого процесса свои версии и чужих изменений он не видит,
+# поэтому страницы лент и версии живут в нём не дольше этого срока.
+LOCAL_CACHE_TIMEOUT = 20
+
+# Списки id постов лент: первые FEED_IDS_LENGTH записей каждой ленты.
+FEED_IDS_LENGTH = 1000
+FEED_IDS_TIMEOUT = 60 * 60 * 24
+
+# Отрицательный кеш: 404 для несуществующих профилей, групп и постов
+# отдаются без запросов к БД. Включается только с общим кешем
+# (CACHE_BACKEND=file/memcached): с LocMem процессы не видят чужих меток.
+NEGATIVE_CACHE_TIMEOUT = 60
+EXISTENCE_FILTER_TIMEOUT = 60 * 10
+EXISTENCE_FILTER_ERROR_RATE = 0.01
+
+# Кеш групп по slug и пользователей по username.
+OBJECT_CACHE_TIMEOUT = 60 * 60
+
+# Материализованная лента подписок (fan-out on write).
+FOLLOW_FEED_MATERIALIZED = False
+FOLLOW_FEED_LENGTH = 1000
+FOLLOW_FEED_TIMEOUT = 60 * 60 * 24
+FOLLOW_FEED_FANOUT_LIMIT = 10000
+
+# Заголовок Server-Timing и гистограммы для manage.py dump_timings.
+INSTRUMENTATION_ENABLED = False
+INSTRUMENTATION_CACHE = 'default'
+
+THUMBNAIL_BACKEND = 'core.instrumentation.InstrumentedThumbnailBackend'
+
+# Нарезки картинок постов: (ширина, высота) в форматах POST_IMAGE_FORMATS.
+POST_IMAGE_SIZES = ((480, 170), (960, 339), (1440, 508))
+POST_IMAGE_FORMATS = ('webp', 'jpeg')
+POST_THUMBNAIL_WIDTH = 960
+POST_IMAGE_MAX_SIDE = 2560
+POST_IMAGE_MAX_UPLOAD_SIZE = 10 * 2 ** 20
+POST_IMAGE_MAX_PIXELS = 40 * 10 ** 6
+# manage.py sweep_images не трогает файлы моложе этого срока (секунды).
+POST_IMAGE_SWEEP_GRACE = 60 * 60
+
+# Поиск по постам: 'auto' — FTS5, если таблицы созданы, иначе 'python'.
+POST_SEARCH_BACKEND = 'auto'
+
+BACKGROUND_TASKS_WORKERS = 4
+BACKGROUND_TASKS_EAGER = False
+
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 SECRET_KEY = '%_758b8mg(i&jws1#0+@6#vzm8nr4_ld0hav@bey^s#l=$+9xq'
@@ -17,20 +79,46 @@ ALLOWED_HOSTS = [
     'testserver',
 ]
 
+# Общий для всех воркеров кеш задаётся окружением:
+# CACHE_BACKEND=file CACHE_LOCATION=/var/tmp/yatube_cache — воркеры
+# одной машины (add атомарен через блокировку файла);
+# CACHE_BACKEND=memcached CACHE_LOCATION=127.0.0.1:11211 — несколько
+# машин, нужен пакет python-memcached.
+CACHE_BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'file': 'core.cache.AtomicFileBasedCache',
+    'memcached': 'django.core.cache.backends.memcached.MemcachedCache',
+}
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'locmem')
+
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'BACKEND': CACHE_BACKENDS.get(CACHE_BACKEND, CACHE_BACKEND),
+        'LOCATION': os.environ.get('CACHE_LOCATION', ''),
     }
 }
 
+# Защита от одновременного пересчёта (core.cache): сколько секунд
+# держится блокировка, сколько можно отдавать устаревшее значение
+# во время пересчёта и коэффициент вероятностного раннего обновления.
+CACHE_LOCK_TIMEOUT = 10
+CACHE_STALE_TIMEOUT = 60
+CACHE_EARLY_REFRESH_BETA = 1.0
+
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+FILE_UPLOAD_HANDLERS = ['posts.uploadhandlers.BoundedUploadHandler']
+# Временные файлы загрузок — в MEDIA_ROOT/tmp, каталог вычисляется
+# при загрузке (posts.uploadhandlers.upload_temp_dir).
+FILE_UPLOAD_TEMP_DIR = None
+
 INSTALLED_APPS = [
     'about.apps.AboutConfig',
     'core.apps.CoreConfig',
     'users.apps.UsersConfig',
     'posts.apps.PostsConfig',
+    'api.apps.ApiConfig',
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
@@ -41,6 +129,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.InstrumentationMiddleware',
+    'core.middleware.ReplicaStickinessMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -77,9 +167,23 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
-    }
+    },
+    # Локальная замена реплики: та же база, в тестах — зеркало default.
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'TEST': {'MIRROR': 'default'},
+    },
 }
 
+DATABASE_ROUTERS = ['core.db_router.ReplicaRouter']
+
+# Алиасы реплик для чтения; пустой список — всё идёт в default.
+DATABASE_REPLICAS = []
+
+# Сколько секунд после записи пользователь читает из основной БД.
+REPLICA_STICKY_SECONDS = 5
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {